@@ -0,0 +1,82 @@
+"""Пропускная способность опроса в пуле процессов.
+
+Запуск: python benchmarks/bench_pool.py
+Каждый студент получает ответ с HOMEWORKS работами: время уходит на
+разбор JSON, проверку и подготовку уведомлений.
+"""
+import json
+import os
+import sys
+import time
+from os.path import abspath, dirname
+
+sys.path.append(dirname(dirname(abspath(__file__))))
+
+import homework  # noqa: E402
+from pool import WorkerPool  # noqa: E402
+
+TENANTS = 64
+HOMEWORKS = 5000
+STATUSES = tuple(homework.VERDICTS)
+BODY = json.dumps({
+    'homeworks': [
+        {'id': index, 'homework_name': f'hw{index}',
+         'status': STATUSES[index % len(STATUSES)],
+         'reviewer_comment': 'Всё нравится', 'lesson_name': 'Итоговый проект'}
+        for index in range(HOMEWORKS)
+    ],
+    'current_date': 0,
+})
+
+
+class Response:
+    status_code = 200
+
+    def json(self):
+        return json.loads(BODY)
+
+
+def fake_get(url, **kwargs):
+    return Response()
+
+
+def use_fake_transport():
+    homework.TRANSPORT = fake_get
+
+
+def main():
+    settings = tuple(
+        getattr(homework, name) for name in homework.RETRY_SETTINGS
+    )
+    tasks = [
+        (f'tenant{index}', 'token', 0, settings) for index in range(TENANTS)
+    ]
+    cores = len(os.sched_getaffinity(0))
+    print(f'доступно ядер: {cores}')
+    if cores == 1:
+        print('на одном ядре пул не может дать ускорения, '
+              'результат показывает только накладные расходы')
+    use_fake_transport()
+    started = time.perf_counter()
+    for task in tasks:
+        homework.poll_descriptor(task)
+    baseline = TENANTS / (time.perf_counter() - started)
+    print(f'{"в одном процессе":>20}: {baseline:7.1f} студентов/с')
+    sizes = sorted({1, 2, 4, cores})
+    for size in sizes:
+        pool = WorkerPool(
+            size, homework.poll_descriptor, homework.crashed_result,
+            use_fake_transport
+        )
+        pool.map(tasks[:size])
+        started = time.perf_counter()
+        results = pool.map(tasks)
+        rate = TENANTS / (time.perf_counter() - started)
+        pool.close()
+        assert all(result[5] is None for result in results)
+        print(f'{size:>11} процессов: {rate:7.1f} студентов/с '
+              f'(x{rate / baseline:.2f})')
+
+
+if __name__ == '__main__':
+    main()
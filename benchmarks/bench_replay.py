@@ -0,0 +1,78 @@
+"""Воспроизведение записанного обмена с API через цикл обработки.
+
+Запуск: python benchmarks/bench_replay.py [файл записи] [скорость]
+Без файла используется синтетическая запись. Скорость 0 отключает
+задержки, 1 воспроизводит исходный темп запросов (offset) и задержки
+ответов (elapsed), 600 ускоряет их в 600 раз. Каждая запись - один
+запрос без повторов; задержка считается от момента, когда запрос должен
+был уйти по записи.
+"""
+import random
+import statistics
+import sys
+import time
+from os.path import abspath, dirname
+
+sys.path.append(dirname(dirname(abspath(__file__))))
+
+import homework  # noqa: E402
+from exceptions import ReplayExhausted  # noqa: E402
+from replay import ReplayTransport, load_records  # noqa: E402
+
+SYNTHETIC_REQUESTS = 2000
+STATUSES = ('approved', 'reviewing', 'rejected')
+
+
+def synthetic_records():
+    records = []
+    for number in range(SYNTHETIC_REQUESTS):
+        homeworks = [
+            {'homework_name': f'hw{number}_{index}',
+             'status': random.choice(STATUSES)}
+            for index in range(random.randint(0, 3))
+        ]
+        records.append({
+            'offset': number * 600,
+            'status_code': 200,
+            'json': {'homeworks': homeworks, 'current_date': number},
+            'elapsed': random.lognormvariate(-2.5, 0.6),
+        })
+    return records
+
+
+def main():
+    records = load_records(sys.argv[1]) if len(sys.argv) > 1 else (
+        synthetic_records()
+    )
+    speed = float(sys.argv[2]) if len(sys.argv) > 2 else 0
+    homework.TRANSPORT = ReplayTransport(records, speed)
+    homework.RETRY_ATTEMPTS = 1
+    latencies, errors = [], 0
+    started = time.monotonic()
+    for record in records:
+        request_started = time.monotonic()
+        if speed:
+            request_started = max(request_started, started + (
+                record.get('offset', 0) - records[0].get('offset', 0)
+            ) / speed)
+        try:
+            for hw in homework.check_response(
+                homework.fetch_api_answer(0, homework.HEADERS)
+            ):
+                homework.parse_status(hw)
+        except ReplayExhausted:
+            break
+        except Exception:
+            errors += 1
+        latencies.append(time.monotonic() - request_started)
+    total = time.monotonic() - started
+    quantiles = statistics.quantiles(latencies, n=100)
+    print(f'запросов: {len(latencies)}, ошибок: {errors}')
+    print(f'пропускная способность: {len(latencies) / total:.0f} запр/с')
+    print('задержка p50/p95/p99: {:.3f}/{:.3f}/{:.3f} мс'.format(
+        *(quantiles[index] * 1000 for index in (49, 94, 98))
+    ))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""Исходные check_response + parse_status против ResponseValidator.
+
+Запуск: python benchmarks/bench_schema.py
+Эталон - копии функций из версии до ResponseValidator: они проверяют
+только ответ целиком и статус, но не типы полей и не все работы сразу.
+"""
+import random
+import sys
+import timeit
+from os.path import abspath, dirname
+
+sys.path.append(dirname(dirname(abspath(__file__))))
+
+import homework  # noqa: E402
+
+SIZES = (10, 1000, 100000)
+STATUSES = tuple(homework.VERDICTS)
+UNKNOWN_STATUS = 'Неизвестный статус. Ошибка {}'
+RESPONSE_NOT_DICT = 'Ответ на запрос не является словарём'
+HOMEWORKS_NOT_IN_RESPONSE = 'В ответе на запрос нет ключа homeworks'
+HOMEWORKS_NOT_LIST = 'homeworks не является списком'
+
+
+def baseline_check_response(response):
+    """check_response до ResponseValidator."""
+    if not isinstance(response, dict):
+        raise TypeError(RESPONSE_NOT_DICT)
+    if 'homeworks' not in response:
+        raise KeyError(HOMEWORKS_NOT_IN_RESPONSE)
+    if not isinstance(response['homeworks'], list):
+        raise TypeError(HOMEWORKS_NOT_LIST)
+    return response['homeworks']
+
+
+def baseline_parse_status(homework_data):
+    """parse_status до ResponseValidator."""
+    status = homework_data['status']
+    verdict = homework.VERDICTS[status]
+    if status not in homework.VERDICTS:
+        raise ValueError(UNKNOWN_STATUS.format(status))
+    return homework.CHANGED_STATUS.format(
+        homework_data['homework_name'], verdict
+    )
+
+
+def make_response(size):
+    return {
+        'homeworks': [
+            {'id': index, 'homework_name': f'hw{index}',
+             'status': random.choice(STATUSES),
+             'reviewer_comment': '', 'lesson_name': 'lesson'}
+            for index in range(size)
+        ],
+        'current_date': 0,
+    }
+
+
+def baseline(response):
+    return [
+        baseline_parse_status(hw)
+        for hw in baseline_check_response(response)
+    ]
+
+
+def validated(response):
+    homeworks, problems = homework.validate_response(response)
+    return [hw.message for hw in homeworks]
+
+
+def main():
+    for size in SIZES:
+        response = make_response(size)
+        assert baseline(response) == validated(response)
+        number = max(1, 100000 // size)
+        timings = {}
+        for name, func in (('исходные функции', baseline),
+                           ('ResponseValidator', validated)):
+            seconds = min(timeit.repeat(
+                lambda: func(response), number=number, repeat=5
+            )) / number
+            timings[name] = seconds / size * 1e9
+            print(f'{size:>7} работ {name:>18}: '
+                  f'{timings[name]:7.1f} нс/работа')
+        ratio = timings['исходные функции'] / timings['ResponseValidator']
+        print(f'{"":>13}ускорение: x{ratio:.2f}')
+
+
+if __name__ == '__main__':
+    main()
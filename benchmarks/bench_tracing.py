@@ -0,0 +1,41 @@
+"""Накладные расходы трассировки этапов цикла.
+
+Запуск: python benchmarks/bench_tracing.py
+"""
+import sys
+import timeit
+from os.path import abspath, dirname
+
+sys.path.append(dirname(dirname(abspath(__file__))))
+
+from tracing import Tracer  # noqa: E402
+
+NUMBER = 1_000_000
+
+
+def bare():
+    pass
+
+
+def run(tracer):
+    def traced():
+        with tracer.span('stage'):
+            pass
+    return traced
+
+
+def main():
+    disabled = Tracer(enabled=False)
+    enabled = Tracer(enabled=True, threshold=float('inf'))
+    enabled.start_cycle()
+    for name, func in (
+        ('без трассировки', bare),
+        ('трассировка выключена', run(disabled)),
+        ('трассировка включена', run(enabled)),
+    ):
+        seconds = min(timeit.repeat(func, number=NUMBER, repeat=5))
+        print(f'{name:>24}: {seconds / NUMBER * 1e9:8.1f} нс/вызов')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+import json
+import logging
+import os
+from collections import namedtuple
+
+CONFIG_READ_ERROR = 'Не удалось прочитать конфигурацию {}. Ошибка {}'
+CONFIG_RELOADED = ('Конфигурация {} перечитана: добавлено {}, '
+                   'удалено {}, изменено {}')
+DEFAULT_TENANT = 'default'
+UNKNOWN_SETTING = 'Неизвестная настройка {}'
+INVALID_SETTING = 'Недопустимое значение {!r} настройки {}'
+TRUE_VALUES = ('1', 'true', 'yes', 'on')
+FALSE_VALUES = ('0', 'false', 'no', 'off')
+
+
+class Tenant(namedtuple('Tenant', 'name practicum_token chat_id')):
+    """Отслеживаемый студент: токен Практикума и чат для уведомлений."""
+
+    __slots__ = ()
+
+    @property
+    def headers(self):
+        """Заголовки запроса к API от имени студента."""
+        return {'Authorization': f'OAuth {self.practicum_token}'}
+
+
+def env_tenants():
+    """Студент из переменных окружения, если они заданы."""
+    token = os.getenv('PRACTICUM_TOKEN')
+    chat_id = os.getenv('TELEGRAM_CHAT_ID')
+    if not (token and chat_id):
+        return {}
+    return {DEFAULT_TENANT: Tenant(DEFAULT_TENANT, token, chat_id)}
+
+
+def load_config(path):
+    """Чтение файла конфигурации.
+
+    Формат JSON: {"settings": {"RETRY_TIME": 600},
+    "tenants": {"name": {"practicum_token": "...", "chat_id": 1}}}.
+    Студенты из файла дополняют студента из переменных окружения.
+    """
+    with open(path, encoding='UTF-8') as file:
+        data = json.load(file)
+    tenants = env_tenants()
+    for name, tenant in data.get('tenants', {}).items():
+        tenants[name] = Tenant(
+            name, tenant['practicum_token'], tenant['chat_id']
+        )
+    return data.get('settings', {}), tenants
+
+
+def parse_bool(value):
+    """Логическое значение из bool или строки вида true/false."""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, str) and value.lower() in TRUE_VALUES:
+        return True
+    if isinstance(value, str) and value.lower() in FALSE_VALUES:
+        return False
+    raise ValueError(value)
+
+
+def parse_setting(kind, minimum, value):
+    """Значение настройки типа kind: bool, int или float не меньше minimum."""
+    if kind is bool:
+        return parse_bool(value)
+    if isinstance(value, bool) or not isinstance(value, (int, float, str)):
+        raise ValueError(value)
+    if kind is int and isinstance(value, float) and not value.is_integer():
+        raise ValueError(value)
+    number = kind(value)
+    if not number >= minimum:
+        raise ValueError(value)
+    return number
+
+
+def parse_settings(settings, kinds):
+    """Проверка всех настроек до применения любой из них.
+
+    kinds - пары (тип, минимум) допустимых настроек по именам; для bool
+    минимум не проверяется. Неизвестные настройки
+    пропускаются с предупреждением; если хоть одно значение неверно,
+    выбрасывается ValueError со всеми ошибками.
+    """
+    if not isinstance(settings, dict):
+        raise ValueError(settings)
+    parsed, errors = {}, []
+    for name, value in settings.items():
+        if name not in kinds:
+            logging.warning(UNKNOWN_SETTING.format(name))
+            continue
+        try:
+            parsed[name] = parse_setting(*kinds[name], value)
+        except (TypeError, ValueError):
+            errors.append(INVALID_SETTING.format(value, name))
+    if errors:
+        raise ValueError('; '.join(errors))
+    return parsed
+
+
+def diff_tenants(old, new):
+    """Добавленные, удалённые и изменённые студенты."""
+    added = [new[name] for name in new.keys() - old.keys()]
+    removed = list(old.keys() - new.keys())
+    changed = [
+        new[name] for name in new.keys() & old.keys()
+        if new[name] != old[name]
+    ]
+    return added, removed, changed
+
+
+class ConfigWatcher:
+    """Слежение за файлом конфигурации по времени изменения.
+
+    Файл с неверными настройками отвергается целиком: ни настройки, ни
+    студенты из него не применяются до следующего изменения файла.
+    """
+
+    def __init__(self, path, kinds=None):
+        """Пустой path означает, что студенты берутся только из окружения.
+
+        kinds - типы и минимумы допустимых настроек, см. parse_settings.
+        """
+        self.path = path
+        self.kinds = kinds or {}
+        self.mtime = None
+        self.settings = {}
+        self.tenants = {}
+
+    def poll(self):
+        """Перечитать файл, если он изменился.
+
+        Возвращает (settings, added, removed, changed) или None, если
+        конфигурация не менялась или её не удалось прочитать.
+        """
+        if not self.path:
+            if self.mtime is not None:
+                return None
+            self.mtime = 0
+            settings, tenants = {}, env_tenants()
+        else:
+            try:
+                mtime = os.stat(self.path).st_mtime_ns
+                if mtime == self.mtime:
+                    return None
+                self.mtime = mtime
+                settings, tenants = load_config(self.path)
+                settings = parse_settings(settings, self.kinds)
+            except (OSError, ValueError, LookupError, TypeError,
+                    AttributeError) as error:
+                logging.error(CONFIG_READ_ERROR.format(self.path, error))
+                return None
+        added, removed, changed = diff_tenants(self.tenants, tenants)
+        self.settings, self.tenants = settings, tenants
+        logging.info(CONFIG_RELOADED.format(
+            self.path, len(added), len(removed), len(changed)
+        ))
+        return settings, added, removed, changed
@@ -0,0 +1,67 @@
+import time
+
+DIGEST_HEADER = 'Изменения статусов проверки ({}):'
+TELEGRAM_MESSAGE_LIMIT = 4096
+
+
+class Digest:
+    """Накопление изменений статусов и отправка одним сообщением в чат.
+
+    Изменения сразу пишутся в очередь Outbox с пометкой digest, поэтому
+    отметку from_date можно сдвигать в том же commit. Сводка чата
+    собирается, когда первое изменение ждёт дольше interval, изменений
+    набралось max_items или они не помещаются в TELEGRAM_MESSAGE_LIMIT.
+    """
+
+    def __init__(self, outbox, interval, max_items):
+        """Очередь outbox хранит изменения до сборки сводки."""
+        self.outbox = outbox
+        self.interval = interval
+        self.max_items = max_items
+
+    def add(self, chat_id, message):
+        """Добавление сообщения в сводку чата."""
+        self.outbox.put(chat_id, message, digest=True)
+
+    def render(self, messages):
+        """Тексты сводки: не больше max_items сообщений и лимита телеграм."""
+        texts, chunk, size = [], [], len(DIGEST_HEADER)
+        for message in messages:
+            if chunk and (
+                len(chunk) >= self.max_items
+                or size + len(message) + 1 > TELEGRAM_MESSAGE_LIMIT
+            ):
+                texts.append(self.join(chunk))
+                chunk, size = [], len(DIGEST_HEADER)
+            chunk.append(message)
+            size += len(message) + 1
+        if chunk:
+            texts.append(self.join(chunk))
+        return texts
+
+    @staticmethod
+    def join(messages):
+        """Одно сообщение сводки."""
+        if len(messages) == 1:
+            return messages[0]
+        return '\n'.join([DIGEST_HEADER.format(len(messages))] + messages)
+
+    def flush(self, chat_id):
+        """Сборка накопленной сводки чата в очередь на отправку."""
+        self.outbox.collapse(chat_id, self.render)
+
+    def flush_due(self):
+        """Сборка сводок, которые пора отправить."""
+        now = time.time()
+        for chat_id, count, started, size in self.outbox.digests():
+            if (
+                count >= self.max_items
+                or size + count + len(DIGEST_HEADER) > TELEGRAM_MESSAGE_LIMIT
+                or now - started >= self.interval
+            ):
+                self.flush(chat_id)
+
+    def flush_all(self):
+        """Сборка всех накопленных сводок, например перед остановкой."""
+        for chat_id, *_ in self.outbox.digests():
+            self.flush(chat_id)
@@ -6,3 +6,8 @@ class UnexpectedCodeError(Exception):
 class ResponseError(Exception):
     """Ошибка запроса"""
     pass
+
+
+class ReplayExhausted(Exception):
+    """Записанные ответы API закончились"""
+    pass
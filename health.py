@@ -0,0 +1,175 @@
+import json
+import logging
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+HEALTH_STARTED = 'Проверка состояния доступна на порту {}'
+WORKER_STUCK = 'Цикл опроса не отвечает {:.0f} с, перезапуск'
+WORKER_DIED = 'Поток опроса завершился, перезапуск'
+
+
+class Health:
+    """Состояние цикла опроса для /healthz и /readyz.
+
+    Цикл отмечается через beat перед каждым этапом, который может
+    зависнуть; зависшим считается цикл без отметок дольше deadline.
+    """
+
+    def __init__(self):
+        """Состояние до первого цикла."""
+        self.deadline = float('inf')
+        self.ready_age = float('inf')
+        self.heartbeat = time.monotonic()
+        self.in_cycle = False
+        self.last_poll = None
+        self.last_send = None
+        self.failures = {}
+        self.backlog = 0
+        self.restarts = 0
+        self.retry_stats = {}
+
+    def beat(self):
+        """Отметка о том, что цикл опроса жив."""
+        self.heartbeat = time.monotonic()
+        self.in_cycle = True
+
+    def idle(self, backlog):
+        """Цикл закончен, поток опроса ждёт следующего."""
+        self.backlog = backlog
+        self.in_cycle = False
+
+    def polled(self, name, error=None):
+        """Результат опроса API для студента name."""
+        if error is None:
+            self.last_poll = time.monotonic()
+            self.failures.pop(name, None)
+        else:
+            self.failures[name] = self.failures.get(name, 0) + 1
+
+    def forget(self, name):
+        """Студент больше не опрашивается."""
+        self.failures.pop(name, None)
+
+    def sent(self):
+        """Успешная отправка сообщения."""
+        self.last_send = time.monotonic()
+
+    def stuck_for(self):
+        """Сколько секунд цикл висит без отметок; 0, если не висит."""
+        if not self.in_cycle:
+            return 0
+        return max(0, time.monotonic() - self.heartbeat)
+
+    def report(self):
+        """Живость, готовность и подробности для ответа."""
+        now = time.monotonic()
+
+        def age(moment):
+            return None if moment is None else round(now - moment, 3)
+
+        alive = self.stuck_for() <= self.deadline
+        ready = alive and self.last_poll is not None and (
+            now - self.last_poll <= self.ready_age
+        )
+        return alive, ready, {
+            'alive': alive,
+            'ready': ready,
+            'since_last_poll': age(self.last_poll),
+            'since_last_send': age(self.last_send),
+            'stuck_for': round(self.stuck_for(), 3),
+            'backlog': self.backlog,
+            'failing_tenants': len(self.failures),
+            'consecutive_failures': max(self.failures.values(), default=0),
+            'worker_restarts': self.restarts,
+            'retries': dict(self.retry_stats),
+        }
+
+
+class HealthHandler(BaseHTTPRequestHandler):
+    """Ответы на /healthz и /readyz."""
+
+    def do_GET(self):
+        """Отчёт о состоянии: 200 или 503."""
+        alive, ready, details = health.report()
+        if self.path == '/healthz':
+            ok = alive
+        elif self.path == '/readyz':
+            ok = ready
+        else:
+            self.send_error(404)
+            return
+        body = json.dumps(details).encode()
+        self.send_response(200 if ok else 503)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        """Запросы проверок не засоряют лог."""
+        logging.debug(format, *args)
+
+
+def serve(port):
+    """Запуск HTTP-сервера проверок в отдельном потоке."""
+    server = ThreadingHTTPServer(('', port), HealthHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    logging.info(HEALTH_STARTED.format(server.server_port))
+    return server
+
+
+class Watchdog:
+    """Перезапуск потока опроса, если он завис или упал.
+
+    Зависший поток нельзя остановить, поэтому он брошен: target получает
+    функцию alive и должен завершиться, когда она вернёт False, не
+    применяя результатов, полученных после этого. Упавший поток
+    перезапускается не чаще раза в check_interval.
+    """
+
+    def __init__(self, target, check_interval):
+        """target(alive) - цикл опроса."""
+        self.target = target
+        self.check_interval = check_interval
+        self.generation = 0
+        self.worker = None
+        self.stopped = threading.Event()
+
+    def start(self):
+        """Запуск нового поколения потока опроса."""
+        self.generation += 1
+        generation = self.generation
+        health.beat()
+        self.worker = threading.Thread(
+            target=self.target,
+            args=(lambda: self.generation == generation,),
+            daemon=True
+        )
+        self.worker.start()
+
+    def run(self):
+        """Присмотр за потоком опроса; блокирует вызывающий поток."""
+        self.start()
+        while not self.stopped.is_set():
+            self.worker.join(self.check_interval)
+            if self.stopped.is_set():
+                break
+            if not self.worker.is_alive():
+                logging.error(WORKER_DIED)
+                if self.stopped.wait(self.check_interval):
+                    break
+            elif health.stuck_for() > health.deadline:
+                logging.error(WORKER_STUCK.format(health.stuck_for()))
+            else:
+                continue
+            health.restarts += 1
+            self.start()
+
+    def stop(self):
+        """Остановка присмотра и потока опроса."""
+        self.stopped.set()
+        self.generation += 1
+
+
+health = Health()
@@ -1,14 +1,29 @@
 import logging
 import os
+import random
+import signal
+import sys
+import threading
 import time
 from logging import StreamHandler, FileHandler
 
 from dotenv import load_dotenv
 import requests
 import telegram
+from telegram.error import BadRequest, NetworkError, RetryAfter
 from telegram.ext import CommandHandler, Updater
 
+from config import ConfigWatcher, Tenant
+from digest import Digest
 from exceptions import UnexpectedCodeError, ResponseError
+from health import Watchdog, health, serve
+from outbox import Outbox
+from pool import WorkerPool
+from replay import Recorder, ReplayTransport, load_records
+from scheduler import Scheduler
+from schema import ResponseValidator
+from store import StateStore
+from tracing import tracer
 
 load_dotenv()
 
@@ -17,6 +32,59 @@ TELEGRAM_TOKEN = os.getenv('TELEGRAM_TOKEN')
 TELEGRAM_CHAT_ID = os.getenv('TELEGRAM_CHAT_ID')
 
 RETRY_TIME = 600
+REQUEST_TIMEOUT = float(os.getenv('REQUEST_TIMEOUT', 30))
+RETRY_ATTEMPTS = int(os.getenv('RETRY_ATTEMPTS', 5))
+RETRY_BASE_DELAY = float(os.getenv('RETRY_BASE_DELAY', 1))
+RETRY_MAX_DELAY = float(os.getenv('RETRY_MAX_DELAY', 30))
+RETRY_DEADLINE = float(os.getenv('RETRY_DEADLINE', 120))
+MIN_REQUEST_TIMEOUT = 0.1
+RETRY_STATS = {'retries': 0, 'retry_time': 0.0}
+DIGEST_MODE = os.getenv('DIGEST_MODE', '').lower() in ('1', 'true', 'yes')
+DIGEST_INTERVAL = float(os.getenv('DIGEST_INTERVAL', 3600))
+DIGEST_MAX_ITEMS = int(os.getenv('DIGEST_MAX_ITEMS', 20))
+STATUS_MAX_AGE = float(os.getenv('STATUS_MAX_AGE', 600))
+HISTORY_SIZE = int(os.getenv('HISTORY_SIZE', 20))
+PROFILE_FILE = os.getenv('PROFILE_FILE', __file__ + '.prof')
+HEALTH_PORT = int(os.getenv('HEALTH_PORT', 8080))
+WATCHDOG_DEADLINE = float(os.getenv('WATCHDOG_DEADLINE', 300))
+READY_MAX_AGE = float(os.getenv('READY_MAX_AGE', 2 * RETRY_TIME))
+OUTBOX_FILE = os.getenv('OUTBOX_FILE', __file__ + '.outbox')
+OUTBOX_BATCH_SIZE = int(os.getenv('OUTBOX_BATCH_SIZE', 50))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv('OUTBOX_MAX_ATTEMPTS', 10))
+OUTBOX_RETRY_INTERVAL = float(os.getenv('OUTBOX_RETRY_INTERVAL', 30))
+API_RECORD_FILE = os.getenv('API_RECORD_FILE')
+API_REPLAY_FILE = os.getenv('API_REPLAY_FILE')
+API_REPLAY_SPEED = float(os.getenv('API_REPLAY_SPEED', 1))
+TRANSPORT = None
+POOL_WORKERS = int(os.getenv('POOL_WORKERS', 0))
+POOL_TASK_TIMEOUT = (
+    float(os.getenv('POOL_TASK_TIMEOUT'))
+    if os.getenv('POOL_TASK_TIMEOUT') else None
+)
+WORKER_POOL = None
+UNKNOWN_STATUS_POLICY = os.getenv('UNKNOWN_STATUS_POLICY', 'error')
+CONFIG_FILE = os.getenv('CONFIG_FILE')
+SUBSCRIBE_CHATS = {
+    chat_id.strip() for chat_id in os.getenv('SUBSCRIBE_CHATS', '').split(',')
+    if chat_id.strip()
+}
+CONFIG_POLL_INTERVAL = float(os.getenv('CONFIG_POLL_INTERVAL', 10))
+TUNABLES = {
+    'RETRY_TIME': (int, 1),
+    'REQUEST_TIMEOUT': (float, MIN_REQUEST_TIMEOUT),
+    'RETRY_ATTEMPTS': (int, 1),
+    'RETRY_BASE_DELAY': (float, 0),
+    'RETRY_MAX_DELAY': (float, 0),
+    'RETRY_DEADLINE': (float, MIN_REQUEST_TIMEOUT),
+    'DIGEST_MODE': (bool, None),
+    'DIGEST_INTERVAL': (float, 0),
+    'DIGEST_MAX_ITEMS': (int, 1),
+    'STATUS_MAX_AGE': (float, 0),
+}
+RETRY_SETTINGS = (
+    'REQUEST_TIMEOUT', 'RETRY_ATTEMPTS', 'RETRY_BASE_DELAY',
+    'RETRY_MAX_DELAY', 'RETRY_DEADLINE'
+)
 ENDPOINT = 'https://practicum.yandex.ru/api/user_api/homework_statuses/'
 HEADERS = {'Authorization': f'OAuth {PRACTICUM_TOKEN}'}
 
@@ -24,11 +92,18 @@ GREATING = (
     'Привет, {}. Я помогу тебе узнать, '
     'на каком этапе проверки твоя домашка :)'
 )
-UNKNOWN_STATUS = 'Неизвестный статус. Ошибка {}'
+HOMEWORK_STATUS = '"{}": {}'
+TENANT_HEADER = '{}:'
+NO_HOMEWORKS = 'Работ пока нет.'
+NO_HISTORY = 'Изменений статусов пока не было.'
+NOT_SUBSCRIBED = 'Чат не подписан. Отправьте /subscribe <токен Практикума>'
+SUBSCRIBE_USAGE = ('Использование: /subscribe <токен Практикума> [имя]; '
+                   'в чате с несколькими студентами имя обязательно')
+SUBSCRIBED = 'Подписка оформлена, статусы будут приходить в этот чат.'
+SUBSCRIBE_CLOSED = 'Подписка для этого чата недоступна.'
+SUBSCRIBE_DENIED = ('Отклонена подписка студента {} в чате {}: чата нет '
+                    'в SUBSCRIBE_CHATS или студент отслеживается в другом')
 CHANGED_STATUS = 'Изменился статус проверки работы "{}". {}'
-RESPONSE_NOT_DICT = 'Ответ на запрос не является словарём'
-HOMEWORKS_NOT_IN_RESPONSE = 'В ответе на запрос нет ключа homeworks'
-HOMEWORKS_NOT_LIST = 'homeworks не является списком'
 API_ANSWER_ERROR = ('Не удалось получить ответ от API. '
                     'Ошибка - {} Endpoint - {} Header - {} params - {}')
 SUCCESSFUL_SENDING = 'Сообщение {} успешно отправлено!'
@@ -38,23 +113,53 @@ API_ERROR = ('ключ ошибки - {} response error - {} '
 ENDPOINT_ERROR = ('Недоступен эндпоинт {}. Код ответа {}.'
                   ' Params - {}. Header - {}')
 ERROR = 'Сбой в работе программы: {}'
+RETRYING = 'Попытка {} не удалась, повтор через {:.1f} с. Ошибка {}'
+RETRIES_EXHAUSTED = 'Повторы исчерпаны за {} попыток: {}'
+RETRY_STATS_MESSAGE = 'Всего повторов запросов: {}, их время {:.1f} с'
 TOKENS = ('PRACTICUM_TOKEN', 'TELEGRAM_TOKEN', 'TELEGRAM_CHAT_ID')
 MISSING_TOKEN = 'Отсутствует токен {}'
+SCHEMA_ERRORS = 'Ошибки в ответе API: {}'
+WORKER_CRASHED = 'Процесс опроса упал при обработке ответа API'
+POOL_DISABLED = ('Запись и воспроизведение обмена с API выполняются '
+                 'в основном процессе, POOL_WORKERS не используется')
 
 VERDICTS = {
     'approved': 'Работа проверена: ревьюеру всё понравилось. Ура!',
     'reviewing': 'Работа взята на проверку ревьюером.',
     'rejected': 'Работа проверена: у ревьюера есть замечания.'
 }
+validate_response = ResponseValidator(
+    VERDICTS, CHANGED_STATUS, UNKNOWN_STATUS_POLICY
+)
 
 
-def send_message(bot, message):
-    """Отправка сообщения в чат телеграм."""
+def is_transient(error):
+    """Временная ли ошибка телеграм: сеть, таймаут или RetryAfter."""
+    return isinstance(error, (RetryAfter, NetworkError)) and not isinstance(
+        error, BadRequest
+    )
+
+
+def send_to_chat(bot, chat_id, message):
+    """Отправка сообщения в указанный чат телеграм.
+
+    Возвращает True при успехе, None при временной ошибке (отправку
+    стоит повторить позже) и False при постоянной.
+    """
     try:
-        bot.send_message(TELEGRAM_CHAT_ID, message)
+        with tracer.span('send_message'):
+            bot.send_message(chat_id, message)
+        health.sent()
         logging.info(SUCCESSFUL_SENDING.format(message))
+        return True
     except Exception as error:
         logging.exception(SENDING_ERROR.format(message, error))
+        return None if is_transient(error) else False
+
+
+def send_message(bot, message):
+    """Отправка сообщения в чат телеграм."""
+    return send_to_chat(bot, TELEGRAM_CHAT_ID, message)
 
 
 def wake_up(update, context):
@@ -67,16 +172,192 @@ def wake_up(update, context):
     )
 
 
+def load_homeworks(tenant):
+    """Статусы всех работ студента из API, для заполнения кеша."""
+    homeworks, problems = validate_response(
+        fetch_api_answer(0, tenant.headers)
+    )
+    if problems:
+        logging.error(SCHEMA_ERRORS.format('; '.join(problems)))
+    return [(homework.name, homework.status) for homework in homeworks]
+
+
+def status(update, context):
+    """Текущие статусы работ всех студентов чата из кеша."""
+    chat_id = update.effective_chat.id
+    store = context.bot_data['store']
+    try:
+        store.get(chat_id)
+    except KeyError:
+        context.bot.send_message(chat_id=chat_id, text=NOT_SUBSCRIBED)
+        return
+    snapshot = store.snapshot(chat_id, load_homeworks)
+    sections = []
+    for name, homeworks, error in snapshot:
+        if error is not None:
+            logging.error(ERROR.format(error))
+            text = ERROR.format(error)
+        else:
+            text = '\n'.join(
+                HOMEWORK_STATUS.format(homework, VERDICTS.get(status, status))
+                for homework, status in homeworks
+            ) or NO_HOMEWORKS
+        if len(snapshot) > 1:
+            text = TENANT_HEADER.format(name) + '\n' + text
+        sections.append(text)
+    context.bot.send_message(
+        chat_id=chat_id, text='\n\n'.join(sections) or NO_HOMEWORKS
+    )
+
+
+def history(update, context):
+    """Последние уведомления чата из кеша."""
+    chat_id = update.effective_chat.id
+    try:
+        text = '\n'.join(context.bot_data['store'].history(chat_id))
+    except KeyError:
+        text = NOT_SUBSCRIBED
+    context.bot.send_message(chat_id=chat_id, text=text or NO_HISTORY)
+
+
+def subscribe(update, context):
+    """Подписка чата на статусы студента по токену Практикума.
+
+    Без имени меняется токен единственного студента чата. Новый студент
+    добавляется, только если чат есть в SUBSCRIBE_CHATS, а студента с
+    таким именем не отслеживают в другом чате.
+    """
+    chat_id = update.effective_chat.id
+    if len(context.args) not in (1, 2):
+        context.bot.send_message(chat_id=chat_id, text=SUBSCRIBE_USAGE)
+        return
+    store = context.bot_data['store']
+    try:
+        names = [tenant.name for tenant in store.tenants(chat_id)]
+    except KeyError:
+        names = []
+    if len(context.args) == 2:
+        name = context.args[1]
+    elif len(names) == 1:
+        name = names[0]
+    elif names:
+        context.bot.send_message(chat_id=chat_id, text=SUBSCRIBE_USAGE)
+        return
+    else:
+        name = str(chat_id)
+    if name not in names and (
+        str(chat_id) not in SUBSCRIBE_CHATS
+        or store.chat_of(name) is not None
+    ):
+        logging.warning(SUBSCRIBE_DENIED.format(name, chat_id))
+        context.bot.send_message(chat_id=chat_id, text=SUBSCRIBE_CLOSED)
+        return
+    store.subscribe(Tenant(name, context.args[0], chat_id))
+    context.bot.send_message(chat_id=chat_id, text=SUBSCRIBED)
+
+
+def backoff_delays():
+    """Задержки между повторами по схеме decorrelated jitter."""
+    delay = RETRY_BASE_DELAY
+    while True:
+        delay = min(
+            RETRY_MAX_DELAY,
+            random.uniform(RETRY_BASE_DELAY, delay * 3)
+        )
+        yield delay
+
+
+def request_with_retry(params, headers):
+    """GET к API с повтором при сетевых ошибках, таймаутах и 5xx.
+
+    Таймаут каждой попытки не выходит за общий срок RETRY_DEADLINE, но
+    не меньше MIN_REQUEST_TIMEOUT; хотя бы одна попытка делается всегда.
+    """
+    started = time.monotonic()
+    deadline = started + RETRY_DEADLINE
+    delays = backoff_delays()
+    attempts = max(1, RETRY_ATTEMPTS)
+    attempt = 0
+    try:
+        for attempt in range(1, attempts + 1):
+            remaining = deadline - time.monotonic()
+            if attempt > 1 and remaining <= 0:
+                break
+            timeout = max(
+                MIN_REQUEST_TIMEOUT, min(REQUEST_TIMEOUT, remaining)
+            )
+            try:
+                with tracer.span('requests.get'):
+                    response = (TRANSPORT or requests.get)(
+                        ENDPOINT,
+                        headers=headers,
+                        params=params,
+                        timeout=timeout
+                    )
+            except (requests.ConnectionError, requests.Timeout) as error:
+                failure = ConnectionError(
+                    API_ANSWER_ERROR.format(error, ENDPOINT, headers, params)
+                )
+            except requests.RequestException as error:
+                raise ConnectionError(
+                    API_ANSWER_ERROR.format(error, ENDPOINT, headers, params)
+                )
+            else:
+                if response.status_code < 500:
+                    return response
+                failure = UnexpectedCodeError(ENDPOINT_ERROR.format(
+                    ENDPOINT, response.status_code, params, headers
+                ))
+            delay = next(delays)
+            if attempt == attempts or (
+                time.monotonic() + delay >= deadline
+            ):
+                break
+            logging.warning(RETRYING.format(attempt, delay, failure))
+            time.sleep(delay)
+        logging.error(RETRIES_EXHAUSTED.format(attempt, failure))
+        raise failure
+    finally:
+        if attempt > 1:
+            count_retries(attempt - 1, time.monotonic() - started)
+
+
+def count_retries(retries, elapsed):
+    """Учёт в RETRY_STATS запроса, которому понадобились повторы.
+
+    elapsed - полное время запроса: попытки и паузы между ними.
+    """
+    RETRY_STATS['retries'] += retries
+    RETRY_STATS['retry_time'] += elapsed
+    logging.info(RETRY_STATS_MESSAGE.format(
+        RETRY_STATS['retries'], RETRY_STATS['retry_time']
+    ))
+
+
+def setup_transport():
+    """Запись или воспроизведение обмена с API вместо requests.get."""
+    global TRANSPORT
+    if API_REPLAY_FILE:
+        TRANSPORT = ReplayTransport(
+            load_records(API_REPLAY_FILE), API_REPLAY_SPEED
+        )
+    if API_RECORD_FILE:
+        TRANSPORT = Recorder(API_RECORD_FILE).wrap(
+            TRANSPORT or requests.get
+        )
+
+
 def get_api_answer(current_timestamp):
     """Получение списка из API."""
+    return fetch_api_answer(current_timestamp, HEADERS)
+
+
+def fetch_api_answer(current_timestamp, headers):
+    """Получение списка из API с заголовками конкретного студента."""
     params = {'from_date': current_timestamp}
-    try:
-        response = requests.get(ENDPOINT, headers=HEADERS, params=params)
-    except requests.exceptions as error:
-        raise ConnectionError(
-            API_ANSWER_ERROR.format(error, ENDPOINT, HEADERS, params)
-        )
-    response_json = response.json()
+    response = request_with_retry(params, headers)
+    with tracer.span('response.json'):
+        response_json = response.json()
     status_code = response.status_code
     for key in ['code', 'error']:
         if key in response_json:
@@ -85,13 +366,13 @@ def get_api_answer(current_timestamp):
                     key,
                     response_json[key],
                     ENDPOINT,
-                    HEADERS,
+                    headers,
                     params
                 )
             )
     if status_code != 200:
         raise UnexpectedCodeError(
-            ENDPOINT_ERROR.format(ENDPOINT, status_code, params, HEADERS)
+            ENDPOINT_ERROR.format(ENDPOINT, status_code, params, headers)
         )
     logging.debug('Endpoint = 200')
     return response_json
@@ -99,22 +380,12 @@ def get_api_answer(current_timestamp):
 
 def check_response(response):
     """Проверка ключей о response."""
-    if not isinstance(response, dict):
-        raise TypeError(RESPONSE_NOT_DICT)
-    if 'homeworks' not in response:
-        raise KeyError(HOMEWORKS_NOT_IN_RESPONSE)
-    if not isinstance(response['homeworks'], list):
-        raise TypeError(HOMEWORKS_NOT_LIST)
-    return response['homeworks']
+    return validate_response.homeworks(response)
 
 
 def parse_status(homework):
     """Извлечение информации о домашней работе и статуса этой работы."""
-    status = homework['status']
-    verdict = VERDICTS[status]
-    if status not in VERDICTS:
-        raise ValueError(UNKNOWN_STATUS.format(status))
-    return CHANGED_STATUS.format(homework['homework_name'], verdict)
+    return validate_response.parse(homework).message
 
 
 def check_tokens():
@@ -127,27 +398,233 @@ def check_tokens():
     return True
 
 
+def apply_settings(settings, digest):
+    """Применение настроек без перезапуска.
+
+    Настройки уже проверены ConfigWatcher через parse_settings.
+    """
+    globals().update(settings)
+    digest.interval = DIGEST_INTERVAL
+    digest.max_items = DIGEST_MAX_ITEMS
+    if WORKER_POOL is not None:
+        WORKER_POOL.task_timeout = pool_task_timeout()
+
+
+def pool_task_timeout():
+    """Срок задачи в пуле: POOL_TASK_TIMEOUT или срок запроса с повторами."""
+    if POOL_TASK_TIMEOUT is not None:
+        return POOL_TASK_TIMEOUT
+    return RETRY_DEADLINE + REQUEST_TIMEOUT
+
+
+def reload_config(watcher, scheduler, store, digest):
+    """Перечитывание конфигурации и обновление расписания опроса."""
+    scheduler.apply([], [], store.pop_subscriptions())
+    update = watcher.poll()
+    if update is None:
+        return
+    settings, added, removed, changed = update
+    apply_settings(settings, digest)
+    store.max_age = STATUS_MAX_AGE
+    for name in removed:
+        health.forget(name)
+        store.forget(name)
+    scheduler.apply(added, removed, changed)
+
+
+def describe(state):
+    """Компактное описание опроса студента для процесса пула.
+
+    В описание входят текущие значения RETRY_SETTINGS, чтобы процессы
+    пула применяли настройки, перечитанные из файла конфигурации.
+    """
+    return (
+        state.tenant.name, state.tenant.practicum_token, state.timestamp,
+        tuple(globals()[name] for name in RETRY_SETTINGS)
+    )
+
+
+def poll_descriptor(descriptor):
+    """Запрос к API и разбор ответа без побочных эффектов.
+
+    Выполняется как в основном процессе, так и в процессах пула, поэтому
+    возвращает только компактные данные: (name, timestamp, statuses,
+    messages, problems, error, retries), где statuses - пары (работа,
+    статус), а retries - прирост RETRY_STATS за этот опрос.
+    """
+    name, token, timestamp, settings = descriptor
+    globals().update(zip(RETRY_SETTINGS, settings))
+    before = RETRY_STATS['retries'], RETRY_STATS['retry_time']
+    try:
+        response = fetch_api_answer(
+            timestamp, Tenant(name, token, None).headers
+        )
+        homeworks, problems = validate_response(response)
+        result = (
+            name, response.get('current_date', timestamp),
+            [(homework.name, homework.status) for homework in homeworks],
+            [homework.message for homework in homeworks], problems, None
+        )
+    except Exception as error:
+        result = name, timestamp, [], [], [], ERROR.format(error)
+    return result + ((
+        RETRY_STATS['retries'] - before[0],
+        RETRY_STATS['retry_time'] - before[1]
+    ),)
+
+
+def crashed_result(descriptor):
+    """Результат опроса, если процесс пула упал на нём."""
+    name, token, timestamp, settings = descriptor
+    return name, timestamp, [], [], [], ERROR.format(WORKER_CRASHED), (0, 0)
+
+
+def apply_result(bot, notify, store, state, result):
+    """Отправка результата опроса студента.
+
+    Уведомления передаются в notify(chat_id, message); возвращается
+    новая отметка from_date, которую можно сохранить только после того,
+    как уведомления записаны в очередь.
+    """
+    name, timestamp, statuses, messages, problems, error, retries = result
+    chat_id = state.tenant.chat_id
+    if error is not None:
+        health.polled(name, error)
+        logging.error(error)
+        send_to_chat(bot, chat_id, error)
+        return state.timestamp
+    store.record(state.tenant, statuses, messages)
+    for message in messages:
+        notify(chat_id, message)
+    if problems:
+        message = SCHEMA_ERRORS.format('; '.join(problems))
+        logging.error(message)
+        send_to_chat(bot, chat_id, message)
+    health.polled(name)
+    return timestamp
+
+
+def poll_due(bot, notify, store, scheduler, alive):
+    """Опрос студентов, которым пора; возвращает новые отметки.
+
+    Если поток опроса брошен сторожевым таймером, пока ждал API,
+    полученные результаты отбрасываются: их применит новый поток.
+    """
+    due = scheduler.due()
+    for state in due:
+        store.track(state.tenant)
+        scheduler.reschedule(state, RETRY_TIME)
+    health.beat()
+    if WORKER_POOL is None:
+        results = (poll_descriptor(describe(state)) for state in due)
+    else:
+        results = WORKER_POOL.map(
+            [describe(state) for state in due], health.beat
+        )
+        for result in results:
+            RETRY_STATS['retries'] += result[6][0]
+            RETRY_STATS['retry_time'] += result[6][1]
+    checkpoints = []
+    for state, result in zip(due, results):
+        if not alive():
+            break
+        checkpoints.append(
+            (state, apply_result(bot, notify, store, state, result))
+        )
+        health.beat()
+    return checkpoints
+
+
+def poll_loop(bot, outbox, digest, watcher, scheduler, store, alive):
+    """Цикл опроса API; завершается, когда alive() вернёт False."""
+    while alive():
+        health.beat()
+        tracer.check_profile(PROFILE_FILE)
+        tracer.start_cycle()
+        with tracer.span('reload_config'):
+            reload_config(watcher, scheduler, store, digest)
+        notify = digest.add if DIGEST_MODE else outbox.put
+        checkpoints = poll_due(bot, notify, store, scheduler, alive)
+        if not alive():
+            return
+        with tracer.span('digest'):
+            digest.flush_due()
+        with tracer.span('outbox.commit'):
+            outbox.commit()
+        for state, timestamp in checkpoints:
+            state.timestamp = timestamp
+        tracer.end_cycle()
+        health.idle(scheduler.backlog())
+        time.sleep(scheduler.next_poll_in(CONFIG_POLL_INTERVAL))
+
+
 def main():
     """Основная логика работы бота."""
+    global WORKER_POOL
     if not check_tokens():
         raise KeyError('WRONG_TOKENS')
     updater = Updater(TELEGRAM_TOKEN)
     bot = telegram.Bot(token=TELEGRAM_TOKEN)
-    timestamp = int(time.time())
-    while True:
-        try:
-            response = get_api_answer(timestamp)
-            homework_list = check_response(response)
-            if homework_list:
-                send_message(bot, parse_status(homework_list[0]))
-            timestamp = response.get('current_date', timestamp)
-        except Exception as error:
-            message = ERROR.format(error)
-            logging.error(message)
-            send_message(bot, message)
-        updater.dispatcher.add_handler(CommandHandler('start', wake_up))
-        updater.start_polling()
-        time.sleep(RETRY_TIME)
+    setup_transport()
+    if POOL_WORKERS and TRANSPORT is not None:
+        logging.warning(POOL_DISABLED)
+    elif POOL_WORKERS:
+        WORKER_POOL = WorkerPool(
+            POOL_WORKERS, poll_descriptor, crashed_result,
+            task_timeout=pool_task_timeout()
+        )
+    outbox = Outbox(OUTBOX_FILE, OUTBOX_BATCH_SIZE, OUTBOX_MAX_ATTEMPTS)
+    digest = Digest(outbox, DIGEST_INTERVAL, DIGEST_MAX_ITEMS)
+    watcher = ConfigWatcher(CONFIG_FILE, TUNABLES)
+    scheduler = Scheduler()
+    store = StateStore(HISTORY_SIZE, STATUS_MAX_AGE)
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    signal.signal(
+        signal.SIGUSR1, lambda signum, frame: tracer.request_profile()
+    )
+    updater.dispatcher.bot_data['store'] = store
+    updater.dispatcher.add_handler(CommandHandler('start', wake_up))
+    updater.dispatcher.add_handler(
+        CommandHandler('status', status, run_async=True)
+    )
+    updater.dispatcher.add_handler(
+        CommandHandler('history', history, run_async=True)
+    )
+    updater.dispatcher.add_handler(CommandHandler('subscribe', subscribe))
+    updater.start_polling()
+    health.deadline = WATCHDOG_DEADLINE
+    health.retry_stats = RETRY_STATS
+    health.ready_age = READY_MAX_AGE
+    if HEALTH_PORT:
+        serve(HEALTH_PORT)
+
+    def deliver(chat_id, message):
+        return send_to_chat(bot, chat_id, message)
+
+    drainer_stopped = threading.Event()
+    threading.Thread(
+        target=outbox.run_drainer,
+        args=(deliver, OUTBOX_RETRY_INTERVAL, drainer_stopped),
+        daemon=True
+    ).start()
+    watchdog = Watchdog(
+        lambda alive: poll_loop(
+            bot, outbox, digest, watcher, scheduler, store, alive
+        ),
+        CONFIG_POLL_INTERVAL
+    )
+    try:
+        watchdog.run()
+    finally:
+        watchdog.stop()
+        drainer_stopped.set()
+        digest.flush_all()
+        outbox.commit()
+        outbox.drain(deliver)
+        outbox.close()
+        if WORKER_POOL is not None:
+            WORKER_POOL.close()
+        updater.stop()
 
 
 if __name__ == '__main__':
@@ -0,0 +1,181 @@
+import logging
+import sqlite3
+import threading
+import time
+
+OUTBOX_DROPPED = 'Сообщение {} для чата {} не доставлено за {} попыток'
+OUTBOX_DRAINED = 'Из очереди отправлено {}, осталось с ошибкой {}'
+
+SCHEMA = '''
+CREATE TABLE IF NOT EXISTS outbox (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    chat_id TEXT NOT NULL,
+    message TEXT NOT NULL,
+    created REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    digest INTEGER NOT NULL DEFAULT 0
+)
+'''
+ADD_DIGEST = 'ALTER TABLE outbox ADD COLUMN digest INTEGER NOT NULL DEFAULT 0'
+
+
+class Outbox:
+    """Очередь уведомлений в SQLite, переживающая падение процесса.
+
+    put только добавляет запись, а commit сохраняет на диск всё
+    добавленное одной транзакцией. Запись удаляется после отправки.
+    Записи с пометкой digest не отправляются, пока collapse не соберёт
+    их в сводку. Фоновая отправка будится только commit, в котором
+    что-то добавлено, иначе повторы идут раз в retry_interval.
+    """
+
+    def __init__(self, path, batch_size, max_attempts):
+        """Путь к файлу базы, размер пачки и лимит попыток отправки."""
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.lock = threading.Lock()
+        self.draining = threading.Lock()
+        self.wakeup = threading.Event()
+        self.added = False
+        self.connection = sqlite3.connect(path, check_same_thread=False)
+        with self.lock:
+            self.connection.execute('PRAGMA journal_mode=WAL')
+            self.connection.execute(SCHEMA)
+            columns = [
+                row[1] for row in
+                self.connection.execute('PRAGMA table_info(outbox)')
+            ]
+            if 'digest' not in columns:
+                self.connection.execute(ADD_DIGEST)
+            self.connection.commit()
+
+    def put(self, chat_id, message, digest=False):
+        """Добавление уведомления; на диск попадёт при commit."""
+        with self.lock:
+            self.connection.execute(
+                'INSERT INTO outbox (chat_id, message, created, digest) '
+                'VALUES (?, ?, ?, ?)',
+                (str(chat_id), message, time.time(), int(digest))
+            )
+            self.added = not digest or self.added
+
+    def digests(self):
+        """Накопленные сводки: (chat_id, число, время первого, символов)."""
+        with self.lock:
+            return self.connection.execute(
+                'SELECT chat_id, COUNT(*), MIN(created), '
+                'SUM(LENGTH(message)) FROM outbox WHERE digest = 1 '
+                'GROUP BY chat_id'
+            ).fetchall()
+
+    def collapse(self, chat_id, render):
+        """Замена накопленной сводки чата на тексты render(messages)."""
+        with self.lock:
+            rows = self.connection.execute(
+                'SELECT id, message FROM outbox '
+                'WHERE digest = 1 AND chat_id = ? ORDER BY id',
+                (str(chat_id),)
+            ).fetchall()
+            if not rows:
+                return
+            self.connection.executemany(
+                'DELETE FROM outbox WHERE id = ?',
+                [(row_id,) for row_id, message in rows]
+            )
+            self.connection.executemany(
+                'INSERT INTO outbox (chat_id, message, created) '
+                'VALUES (?, ?, ?)',
+                [
+                    (str(chat_id), text, time.time())
+                    for text in render([message for _, message in rows])
+                ]
+            )
+            self.added = True
+
+    def commit(self):
+        """Сохранение добавленного одной транзакцией.
+
+        Если добавлены уведомления к отправке, будится фоновая отправка.
+        """
+        with self.lock:
+            self.connection.commit()
+            added, self.added = self.added, False
+        if added:
+            self.wakeup.set()
+
+    def __len__(self):
+        """Число неотправленных уведомлений."""
+        with self.lock:
+            return self.connection.execute(
+                'SELECT COUNT(*) FROM outbox'
+            ).fetchone()[0]
+
+    def drain(self, send):
+        """Отправка пачки уведомлений.
+
+        send(chat_id, message) возвращает True при успехе, False при
+        постоянной ошибке и None при временной: только постоянные ошибки
+        засчитываются в max_attempts, так что сбой сети или RetryAfter
+        не приводят к потере уведомления. Возвращает число неудачных
+        отправок и признак того, что пачка была полной и в очереди могло
+        остаться ещё. После неудачи остальные уведомления того же чата
+        в пачке не отправляются, чтобы не нарушить порядок.
+        """
+        with self.draining:
+            return self._drain(send)
+
+    def _drain(self, send):
+        with self.lock:
+            rows = self.connection.execute(
+                'SELECT id, chat_id, message, attempts FROM outbox '
+                'WHERE digest = 0 ORDER BY id LIMIT ?',
+                (self.batch_size,)
+            ).fetchall()
+        sent, failed, blocked = [], [], set()
+        deferred = 0
+        for row_id, chat_id, message, attempts in rows:
+            if chat_id in blocked:
+                continue
+            result = send(chat_id, message)
+            if result:
+                sent.append((row_id,))
+                continue
+            blocked.add(chat_id)
+            if result is None:
+                deferred += 1
+            elif attempts + 1 >= self.max_attempts:
+                logging.error(OUTBOX_DROPPED.format(
+                    message, chat_id, attempts + 1
+                ))
+                sent.append((row_id,))
+            else:
+                failed.append((row_id,))
+        with self.lock:
+            self.connection.executemany(
+                'DELETE FROM outbox WHERE id = ?', sent
+            )
+            self.connection.executemany(
+                'UPDATE outbox SET attempts = attempts + 1 WHERE id = ?',
+                failed
+            )
+            self.connection.commit()
+        if rows:
+            logging.debug(OUTBOX_DRAINED.format(
+                len(sent), len(failed) + deferred
+            ))
+        return len(failed) + deferred, len(rows) == self.batch_size
+
+    def run_drainer(self, send, retry_interval, stopped):
+        """Фоновая отправка: сразу при старте, после commit и по таймеру."""
+        while not stopped.is_set():
+            self.wakeup.clear()
+            failed, more = self.drain(send)
+            if more and not failed:
+                continue
+            self.wakeup.wait(retry_interval)
+
+    def close(self):
+        """Сохранение и закрытие базы."""
+        with self.lock:
+            self.connection.commit()
+            self.connection.close()
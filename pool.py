@@ -0,0 +1,176 @@
+import logging
+import multiprocessing
+import threading
+import time
+from multiprocessing.connection import wait
+
+WORKER_CRASHED = 'Процесс опроса {} упал, перезапуск'
+TASK_FAILED = 'Задача №{} не выполнена: процесс опроса упал {} раза'
+TASK_TIMEOUT = 'Задача №{} не выполнена за {} с, процесс опроса {} остановлен'
+POOL_STARTED = 'Запущено процессов опроса: {}'
+
+
+def worker_main(connection, handler, initializer):
+    """Цикл процесса опроса: задача из канала, результат обратно."""
+    if initializer is not None:
+        initializer()
+    while True:
+        try:
+            task = connection.recv()
+        except (EOFError, KeyboardInterrupt):
+            return
+        if task is None:
+            return
+        connection.send(handler(task))
+
+
+class Worker:
+    """Процесс опроса и канал к нему."""
+
+    def __init__(self, context, handler, initializer):
+        """Запуск процесса."""
+        self.connection, child = context.Pipe()
+        self.process = context.Process(
+            target=worker_main,
+            args=(child, handler, initializer),
+            daemon=True
+        )
+        self.process.start()
+        child.close()
+        self.task = None
+        self.started = None
+
+    def stop(self, timeout):
+        """Остановка процесса."""
+        try:
+            self.connection.send(None)
+        except (OSError, ValueError):
+            pass
+        self.process.join(timeout)
+        if self.process.is_alive():
+            self.process.terminate()
+            self.process.join()
+        self.connection.close()
+
+
+class WorkerPool:
+    """Пул процессов опроса, которым управляет координатор.
+
+    Процессам передаются компактные описания задач, обратно приходят
+    результаты. Упавший процесс перезапускается, а его задача
+    повторяется до max_crashes раз, после чего её результатом
+    становится on_crash(task). Процесс, не справившийся с задачей за
+    task_timeout секунд, убивается и перезапускается, а результатом
+    задачи сразу становится on_crash(task). Вызовы map из разных потоков
+    выполняются по очереди.
+    """
+
+    def __init__(self, size, handler, on_crash, initializer=None,
+                 max_crashes=2, task_timeout=None):
+        """Запуск size процессов, выполняющих handler(task)."""
+        self.context = multiprocessing.get_context('spawn')
+        self.handler = handler
+        self.on_crash = on_crash
+        self.initializer = initializer
+        self.max_crashes = max_crashes
+        self.task_timeout = task_timeout
+        self.restarts = 0
+        self.lock = threading.Lock()
+        self.workers = [self.spawn() for _ in range(size)]
+        logging.info(POOL_STARTED.format(size))
+
+    def spawn(self):
+        """Новый процесс опроса."""
+        return Worker(self.context, self.handler, self.initializer)
+
+    def map(self, tasks, progress=None):
+        """Выполнение задач; результаты в порядке задач.
+
+        progress() вызывается после каждого готового результата.
+        """
+        with self.lock:
+            return self._map(tasks, progress or (lambda: None))
+
+    def _map(self, tasks, progress):
+        pending = list(enumerate(tasks))
+        pending.reverse()
+        results = [None] * len(pending)
+        crashes = {}
+        busy = {}
+        while pending or busy:
+            for worker in list(self.workers):
+                if pending and worker.task is None:
+                    self.assign(worker, pending.pop(), pending, busy)
+            for connection in wait(list(busy), self.wait_timeout(busy)):
+                worker = busy.pop(connection)
+                index, task = worker.task
+                worker.task = None
+                try:
+                    results[index] = connection.recv()
+                except (EOFError, OSError):
+                    self.replace(worker)
+                    crashes[index] = crashes.get(index, 0) + 1
+                    if crashes[index] < self.max_crashes:
+                        pending.append((index, task))
+                        continue
+                    logging.error(TASK_FAILED.format(index, crashes[index]))
+                    results[index] = self.on_crash(task)
+                progress()
+            for worker in self.overdue(busy):
+                del busy[worker.connection]
+                index, task = worker.task
+                worker.task = None
+                logging.error(TASK_TIMEOUT.format(
+                    index, self.task_timeout, worker.process.pid
+                ))
+                self.replace(worker)
+                results[index] = self.on_crash(task)
+                progress()
+        return results
+
+    def wait_timeout(self, busy):
+        """Сколько ждать результатов до истечения срока первой задачи."""
+        if self.task_timeout is None or not busy:
+            return None
+        started = min(worker.started for worker in busy.values())
+        return max(0, started + self.task_timeout - time.monotonic())
+
+    def overdue(self, busy):
+        """Процессы, не уложившиеся в task_timeout."""
+        if self.task_timeout is None:
+            return []
+        now = time.monotonic()
+        return [
+            worker for worker in busy.values()
+            if now - worker.started >= self.task_timeout
+        ]
+
+    def assign(self, worker, item, pending, busy):
+        """Передача задачи процессу.
+
+        Если процесс упал, пока простаивал, он перезапускается, а задача
+        возвращается в очередь.
+        """
+        try:
+            worker.connection.send(item[1])
+        except (OSError, ValueError):
+            self.replace(worker)
+            pending.append(item)
+            return
+        worker.task = item
+        worker.started = time.monotonic()
+        busy[worker.connection] = worker
+
+    def replace(self, worker):
+        """Перезапуск упавшего процесса."""
+        logging.error(WORKER_CRASHED.format(worker.process.pid))
+        worker.stop(0)
+        self.workers[self.workers.index(worker)] = self.spawn()
+        self.restarts += 1
+
+    def close(self, timeout=5):
+        """Остановка всех процессов."""
+        with self.lock:
+            for worker in self.workers:
+                worker.stop(timeout)
+            self.workers = []
@@ -0,0 +1,147 @@
+import json
+import threading
+import time
+
+import requests
+
+from exceptions import ReplayExhausted
+
+REDACTED = '***'
+REPLAY_EXHAUSTED = 'Записанные ответы API закончились: {}'
+
+
+def redact_authorization(value):
+    """Схема авторизации без токена; всё значение, если схемы нет."""
+    parts = str(value).split(' ')
+    if len(parts) == 2 and all(parts):
+        return parts[0] + ' ' + REDACTED
+    return REDACTED
+
+
+def redact(headers):
+    """Заголовки без токенов."""
+    return {
+        name: (redact_authorization(value)
+               if name.lower() == 'authorization' else value)
+        for name, value in (headers or {}).items()
+    }
+
+
+class Recorder:
+    """Запись запросов к API и ответов на них в JSON lines."""
+
+    def __init__(self, path):
+        """Записи дописываются в конец файла path."""
+        self.path = path
+        self.lock = threading.Lock()
+        self.started = time.monotonic()
+
+    def wrap(self, get):
+        """Транспорт с сигнатурой requests.get, записывающий обмен."""
+        def recording_get(url, headers=None, params=None, **kwargs):
+            offset = time.monotonic() - self.started
+            record = {
+                'offset': round(offset, 6),
+                'url': url,
+                'headers': redact(headers),
+                'params': params,
+            }
+            try:
+                response = get(url, headers=headers, params=params, **kwargs)
+            except requests.RequestException as error:
+                record['error'] = type(error).__name__
+                raise
+            else:
+                record['status_code'] = response.status_code
+                try:
+                    record['json'] = response.json()
+                except ValueError:
+                    record['text'] = response.text
+                return response
+            finally:
+                record['elapsed'] = round(
+                    time.monotonic() - self.started - offset, 6
+                )
+                self.write(record)
+        return recording_get
+
+    def write(self, record):
+        """Добавление одной записи в файл."""
+        line = json.dumps(record, ensure_ascii=False)
+        with self.lock, open(self.path, 'a', encoding='UTF-8') as file:
+            file.write(line + '\n')
+
+
+def load_records(path):
+    """Чтение записей из файла JSON lines."""
+    with open(path, encoding='UTF-8') as file:
+        return [json.loads(line) for line in file if line.strip()]
+
+
+class ReplayResponse:
+    """Ответ API, восстановленный из записи."""
+
+    def __init__(self, record):
+        """Код ответа и тело из записи."""
+        self.status_code = record['status_code']
+        self.record = record
+        self.text = record.get('text') or json.dumps(record.get('json'))
+
+    def json(self):
+        """Тело ответа; ValueError, если он был не JSON."""
+        if 'json' not in self.record:
+            raise ValueError(self.text)
+        return self.record['json']
+
+
+class ReplayTransport:
+    """Транспорт с сигнатурой requests.get, отдающий записанные ответы.
+
+    Ответы выдаются по порядку и в исходном темпе: запрос ждёт, пока с
+    первого ответа пройдёт (offset - offset первой записи) / speed, и
+    затем ещё elapsed / speed. speed=0 отключает задержки. С loop=True
+    запись повторяется по кругу, темп отсчитывается заново.
+    """
+
+    def __init__(self, records, speed=1.0, loop=False):
+        """Записи records из load_records."""
+        self.records = records
+        self.speed = speed
+        self.loop = loop
+        self.position = 0
+        self.started = None
+        self.lock = threading.Lock()
+
+    def next_record(self):
+        """Очередная запись и момент, когда её отдать."""
+        with self.lock:
+            if self.position >= len(self.records):
+                if not self.loop or not self.records:
+                    raise ReplayExhausted(
+                        REPLAY_EXHAUSTED.format(self.position)
+                    )
+                self.position = 0
+            if self.position == 0:
+                self.started = time.monotonic()
+            record = self.records[self.position]
+            self.position += 1
+            if not self.speed:
+                return record, 0
+            offset = record.get('offset', 0) - self.records[0].get(
+                'offset', 0
+            )
+            return record, self.started + (
+                offset + record.get('elapsed', 0)
+            ) / self.speed
+
+    def __call__(self, url, **kwargs):
+        """Ответ вместо requests.get."""
+        record, due = self.next_record()
+        if self.speed:
+            time.sleep(max(0, due - time.monotonic()))
+        if 'error' in record:
+            raise getattr(
+                requests.exceptions, record['error'],
+                requests.RequestException
+            )()
+        return ReplayResponse(record)
@@ -0,0 +1,77 @@
+import threading
+import time
+
+
+class TenantState:
+    """Состояние опроса студента: с какой даты и когда опрашивать."""
+
+    __slots__ = ('tenant', 'timestamp', 'next_poll')
+
+    def __init__(self, tenant, timestamp, next_poll):
+        """Студент, отметка from_date и время следующего опроса."""
+        self.tenant = tenant
+        self.timestamp = timestamp
+        self.next_poll = next_poll
+
+
+class Scheduler:
+    """Расписание опроса API по студентам.
+
+    Изменения конфигурации применяются поштучно: состояние студентов,
+    которых изменение не затронуло, не пересоздаётся. Методы защищены
+    блокировкой: брошенный сторожевым таймером поток опроса может ещё
+    обращаться к расписанию.
+    """
+
+    def __init__(self):
+        """Пустое расписание."""
+        self.states = {}
+        self.lock = threading.Lock()
+
+    def apply(self, added, removed, changed):
+        """Применение разницы конфигураций."""
+        with self.lock:
+            self._apply(added, removed, changed)
+
+    def _apply(self, added, removed, changed):
+        now = time.monotonic()
+        for name in removed:
+            self.states.pop(name, None)
+        for tenant in added:
+            self.states[tenant.name] = TenantState(
+                tenant, int(time.time()), now
+            )
+        for tenant in changed:
+            state = self.states.get(tenant.name)
+            if state is None:
+                self.states[tenant.name] = TenantState(
+                    tenant, int(time.time()), now
+                )
+            else:
+                state.tenant = tenant
+
+    def due(self):
+        """Студенты, которых пора опросить."""
+        now = time.monotonic()
+        with self.lock:
+            return [
+                state for state in self.states.values()
+                if state.next_poll <= now
+            ]
+
+    def backlog(self):
+        """Число студентов, опрос которых просрочен."""
+        return len(self.due())
+
+    def reschedule(self, state, delay):
+        """Следующий опрос студента через delay секунд."""
+        with self.lock:
+            state.next_poll = time.monotonic() + delay
+
+    def next_poll_in(self, default):
+        """Сколько секунд до ближайшего опроса."""
+        with self.lock:
+            if not self.states:
+                return default
+            nearest = min(state.next_poll for state in self.states.values())
+        return max(0, min(default, nearest - time.monotonic()))
@@ -0,0 +1,84 @@
+from collections import namedtuple
+
+RESPONSE_NOT_DICT = 'Ответ на запрос не является словарём'
+HOMEWORKS_NOT_IN_RESPONSE = 'В ответе на запрос нет ключа homeworks'
+HOMEWORKS_NOT_LIST = 'homeworks не является списком'
+HOMEWORK_NOT_DICT = 'работа не является словарём'
+HOMEWORK_KEY_MISSING = 'нет ключа {}'
+HOMEWORK_NOT_STRING = 'значение {} не является строкой: {!r}'
+UNKNOWN_STATUS = 'неизвестный статус {} у работы "{}"'
+UNKNOWN_VERDICT = 'Статус работы: {}.'
+HOMEWORK_PROBLEM = 'homeworks[{}]: {}'
+
+POLICIES = ('generic', 'skip', 'error')
+
+Homework = namedtuple('Homework', 'name status verdict message')
+
+
+class ResponseValidator:
+    """Проверка ответа API за один проход.
+
+    Вызов validator(response) возвращает (homeworks, problems): записи
+    Homework с готовыми по template текстами уведомлений для корректных
+    работ и все ошибки схемы в остальных. Работы с неизвестным статусом
+    по политике unknown_policy получают общий вердикт (generic),
+    пропускаются (skip) или попадают в ошибки (error).
+    """
+
+    def __init__(self, verdicts, template, unknown_policy='error'):
+        """Вердикты по статусам, шаблон уведомления и политика."""
+        if unknown_policy not in POLICIES:
+            raise ValueError(unknown_policy)
+        self.verdicts = verdicts
+        self.template = template
+        self.unknown_policy = unknown_policy
+
+    def homeworks(self, response):
+        """Список работ из ответа; ошибка, если ответ в целом неверен."""
+        if not isinstance(response, dict):
+            raise TypeError(RESPONSE_NOT_DICT)
+        if 'homeworks' not in response:
+            raise KeyError(HOMEWORKS_NOT_IN_RESPONSE)
+        if not isinstance(response['homeworks'], list):
+            raise TypeError(HOMEWORKS_NOT_LIST)
+        return response['homeworks']
+
+    def parse(self, homework):
+        """Запись Homework для одной работы.
+
+        KeyError или TypeError, если работа не соответствует схеме,
+        ValueError, если статус неизвестен, а политика не generic.
+        """
+        if not isinstance(homework, dict):
+            raise TypeError(HOMEWORK_NOT_DICT)
+        for key in ('homework_name', 'status'):
+            if key not in homework:
+                raise KeyError(HOMEWORK_KEY_MISSING.format(key))
+            if not isinstance(homework[key], str):
+                raise TypeError(HOMEWORK_NOT_STRING.format(key, homework[key]))
+        name = homework['homework_name']
+        status = homework['status']
+        if status in self.verdicts:
+            verdict = self.verdicts[status]
+        elif self.unknown_policy == 'generic':
+            verdict = UNKNOWN_VERDICT.format(status)
+        else:
+            raise ValueError(UNKNOWN_STATUS.format(status, name))
+        return Homework(
+            name, status, verdict, self.template.format(name, verdict)
+        )
+
+    def __call__(self, response):
+        """Проверка ответа и извлечение работ."""
+        homeworks, problems = [], []
+        for index, homework in enumerate(self.homeworks(response)):
+            try:
+                homeworks.append(self.parse(homework))
+            except ValueError as error:
+                if self.unknown_policy == 'error':
+                    problems.append(HOMEWORK_PROBLEM.format(index, error))
+            except (KeyError, TypeError) as error:
+                problems.append(
+                    HOMEWORK_PROBLEM.format(index, error.args[0])
+                )
+        return homeworks, problems
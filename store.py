@@ -0,0 +1,188 @@
+import queue
+import threading
+import time
+from collections import deque
+
+
+class Fetch:
+    """Запрос к API за статусами студента, результата которого ждут другие."""
+
+    __slots__ = ('done', 'homeworks', 'error')
+
+    def __init__(self):
+        """Запрос ещё выполняется."""
+        self.done = threading.Event()
+        self.homeworks = None
+        self.error = None
+
+
+class TenantCache:
+    """Кеш статусов работ одного студента."""
+
+    __slots__ = ('tenant', 'homeworks', 'fetched_at', 'fetch')
+
+    def __init__(self, tenant):
+        """Пустой кеш для студента tenant."""
+        self.tenant = tenant
+        self.homeworks = {}
+        self.fetched_at = None
+        self.fetch = None
+
+
+class ChatState:
+    """Кеши студентов одного чата и история его уведомлений.
+
+    В чат наставника могут приходить статусы нескольких студентов,
+    поэтому кеш ведётся по имени студента.
+    """
+
+    __slots__ = ('tenants', 'history', 'lock')
+
+    def __init__(self, history_size):
+        """Чат без студентов."""
+        self.tenants = {}
+        self.history = deque(maxlen=history_size)
+        self.lock = threading.Lock()
+
+
+class StateStore:
+    """Локальное хранилище для ответов на команды без запросов к API.
+
+    Цикл опроса записывает сюда изменения, обработчики команд читают.
+    Если данные студента старше max_age, обработчики делают один общий
+    запрос к API: остальные ждут его результата.
+    """
+
+    def __init__(self, history_size, max_age):
+        """Размер истории на чат и допустимый возраст кеша, с."""
+        self.history_size = history_size
+        self.max_age = max_age
+        self.chats = {}
+        self.tenant_chats = {}
+        self.lock = threading.Lock()
+        self.subscriptions = queue.SimpleQueue()
+
+    def track(self, tenant):
+        """Регистрация или обновление студента.
+
+        Если студент сменил чат, из прежнего чата он удаляется.
+        """
+        chat_id = str(tenant.chat_id)
+        with self.lock:
+            previous = self.tenant_chats.get(tenant.name)
+            if previous is not None and previous != chat_id:
+                self._forget(tenant.name, previous)
+            state = self.chats.get(chat_id)
+            if state is None:
+                state = self.chats[chat_id] = ChatState(self.history_size)
+            self.tenant_chats[tenant.name] = chat_id
+        with state.lock:
+            cache = state.tenants.get(tenant.name)
+            if cache is None:
+                state.tenants[tenant.name] = TenantCache(tenant)
+            else:
+                cache.tenant = tenant
+
+    def forget(self, name):
+        """Удаление кеша студента; чат без студентов удаляется целиком."""
+        with self.lock:
+            chat_id = self.tenant_chats.get(name)
+            if chat_id is not None:
+                self._forget(name, chat_id)
+
+    def _forget(self, name, chat_id):
+        self.tenant_chats.pop(name, None)
+        state = self.chats.get(chat_id)
+        if state is None:
+            return
+        with state.lock:
+            state.tenants.pop(name, None)
+            if not state.tenants:
+                del self.chats[chat_id]
+
+    def get(self, chat_id):
+        """Состояние чата; KeyError, если чат не отслеживается."""
+        return self.chats[str(chat_id)]
+
+    def chat_of(self, name):
+        """Чат студента name или None, если студент не отслеживается."""
+        return self.tenant_chats.get(name)
+
+    def tenants(self, chat_id):
+        """Студенты чата; KeyError, если чат не отслеживается."""
+        state = self.get(chat_id)
+        with state.lock:
+            return [cache.tenant for cache in state.tenants.values()]
+
+    def record(self, tenant, statuses, messages):
+        """Запись результата опроса API: пары (работа, статус) и тексты."""
+        self.track(tenant)
+        state = self.get(tenant.chat_id)
+        with state.lock:
+            cache = state.tenants[tenant.name]
+            cache.homeworks.update(statuses)
+            if cache.fetched_at is not None:
+                cache.fetched_at = time.monotonic()
+            state.history.extend(messages)
+
+    def snapshot(self, chat_id, load):
+        """Статусы работ всех студентов чата.
+
+        Возвращает тройки (имя студента, пары (работа, статус), ошибка).
+        Если кеш студента устарел, пары заново получаются из load(tenant);
+        при неудаче вместо пар из кеша возвращается ошибка.
+        """
+        state = self.get(chat_id)
+        with state.lock:
+            caches = list(state.tenants.values())
+        return [self.refresh(state, cache, load) for cache in caches]
+
+    def refresh(self, state, cache, load):
+        """Статусы одного студента, при необходимости из API.
+
+        Запрос выполняется без блокировки кеша, так что запись результатов
+        опроса не ждёт API; остальные обработчики ждут этот же запрос.
+        """
+        with state.lock:
+            name = cache.tenant.name
+            if cache.fetched_at is not None and (
+                time.monotonic() - cache.fetched_at <= self.max_age
+            ):
+                return name, list(cache.homeworks.items()), None
+            fetch = cache.fetch
+            leader = fetch is None
+            if leader:
+                fetch = cache.fetch = Fetch()
+        if not leader:
+            fetch.done.wait()
+        else:
+            try:
+                fetch.homeworks = dict(load(cache.tenant))
+            except Exception as error:
+                fetch.error = error
+            with state.lock:
+                if fetch.error is None:
+                    cache.homeworks = fetch.homeworks
+                    cache.fetched_at = time.monotonic()
+                cache.fetch = None
+            fetch.done.set()
+        if fetch.error is not None:
+            return name, [], fetch.error
+        return name, list(fetch.homeworks.items()), None
+
+    def history(self, chat_id):
+        """Последние уведомления чата."""
+        state = self.get(chat_id)
+        with state.lock:
+            return list(state.history)
+
+    def subscribe(self, tenant):
+        """Заявка на подписку: применяется циклом опроса."""
+        self.subscriptions.put(tenant)
+
+    def pop_subscriptions(self):
+        """Накопленные заявки на подписку."""
+        tenants = []
+        while not self.subscriptions.empty():
+            tenants.append(self.subscriptions.get())
+        return tenants
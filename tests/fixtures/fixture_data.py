@@ -19,3 +19,10 @@ def current_timestamp():
 @pytest.fixture
 def api_url():
     return 'https://practicum.yandex.ru/api/user_api/homework_statuses/'
+
+
+@pytest.fixture(autouse=True)
+def no_retry_delay(monkeypatch):
+    import homework
+    monkeypatch.setattr(homework, 'RETRY_BASE_DELAY', 0)
+    monkeypatch.setattr(homework, 'RETRY_MAX_DELAY', 0)
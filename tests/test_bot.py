@@ -1,4 +1,5 @@
 import os
+import time
 from http import HTTPStatus
 
 import requests
@@ -53,6 +54,14 @@ class MockResponseGET:
         return data
 
 
+def crash_on_negative(task):
+    if task < 0:
+        os._exit(1)
+    if task == 0:
+        time.sleep(60)
+    return task * 2
+
+
 class MockTelegramBot:
 
     def __init__(self, token=None, random_timestamp=None, **kwargs):
@@ -640,3 +649,733 @@ class TestHomework:
                 f'Убедитесь, что в функции `{func_name}` обрабатываете ситуацию, '
                 'когда API возвращает код, отличный от 200'
             )
+
+    def test_get_api_answer_retries_connection_error(
+            self, monkeypatch, random_timestamp, current_timestamp, api_url):
+        failures = iter([requests.ConnectionError(), requests.Timeout()])
+
+        def mock_faulty_response_get(*args, **kwargs):
+            error = next(failures, None)
+            if error is not None:
+                raise error
+            return MockResponseGET(
+                *args, random_timestamp=random_timestamp,
+                current_timestamp=current_timestamp, **kwargs
+            )
+
+        monkeypatch.setattr(requests, 'get', mock_faulty_response_get)
+
+        import homework
+        monkeypatch.setitem(homework.RETRY_STATS, 'retries', 0)
+
+        result = homework.get_api_answer(current_timestamp)
+        assert result['current_date'] == random_timestamp, (
+            'Проверьте, что `get_api_answer` повторяет запрос '
+            'после сетевой ошибки'
+        )
+        assert homework.RETRY_STATS['retries'] == 2, (
+            'Проверьте, что повторы учитываются в `RETRY_STATS`'
+        )
+
+    def test_get_api_answer_survives_degenerate_retry_settings(
+            self, monkeypatch, random_timestamp, current_timestamp, api_url):
+        timeouts = []
+
+        def mock_response_get(*args, **kwargs):
+            timeouts.append(kwargs['timeout'])
+            return MockResponseGET(
+                *args, random_timestamp=random_timestamp,
+                current_timestamp=current_timestamp, **kwargs
+            )
+
+        monkeypatch.setattr(requests, 'get', mock_response_get)
+
+        import homework
+        monkeypatch.setattr(homework, 'RETRY_ATTEMPTS', 0)
+        monkeypatch.setattr(homework, 'RETRY_DEADLINE', 0)
+        result = homework.get_api_answer(current_timestamp)
+        assert result['current_date'] == random_timestamp, (
+            'Убедитесь, что хотя бы одна попытка запроса делается всегда'
+        )
+        assert timeouts == [homework.MIN_REQUEST_TIMEOUT], (
+            'Убедитесь, что таймаут запроса всегда положительный'
+        )
+
+    def test_get_api_answer_response_error_not_retried(
+            self, monkeypatch, random_timestamp, current_timestamp, api_url):
+        calls = []
+
+        def mock_error_response_get(*args, **kwargs):
+            calls.append(kwargs)
+            response = MockResponseGET(
+                *args, random_timestamp=random_timestamp,
+                current_timestamp=current_timestamp, **kwargs
+            )
+            response.json = lambda: {'code': 'UnknownError'}
+            return response
+
+        monkeypatch.setattr(requests, 'get', mock_error_response_get)
+
+        import homework
+
+        try:
+            homework.get_api_answer(current_timestamp)
+        except homework.ResponseError:
+            pass
+        else:
+            assert False, (
+                'Убедитесь, что `get_api_answer` выбрасывает `ResponseError`, '
+                'если в ответе есть ключ `code`'
+            )
+        assert len(calls) == 1, (
+            'Убедитесь, что ответ с ошибкой в теле не запрашивается повторно'
+        )
+
+    def test_get_api_answer_gives_up_on_5xx(
+            self, monkeypatch, random_timestamp, current_timestamp, api_url):
+        calls = []
+
+        def mock_503_response_get(*args, **kwargs):
+            calls.append(kwargs)
+            return MockResponseGET(
+                *args, random_timestamp=random_timestamp,
+                current_timestamp=current_timestamp,
+                http_status=HTTPStatus.SERVICE_UNAVAILABLE, **kwargs
+            )
+
+        monkeypatch.setattr(requests, 'get', mock_503_response_get)
+
+        import homework
+
+        try:
+            homework.get_api_answer(current_timestamp)
+        except homework.UnexpectedCodeError:
+            pass
+        else:
+            assert False, (
+                'Убедитесь, что `get_api_answer` выбрасывает ошибку, '
+                'когда повторы исчерпаны'
+            )
+        assert len(calls) == homework.RETRY_ATTEMPTS, (
+            'Проверьте, что при 5xx запрос повторяется `RETRY_ATTEMPTS` раз'
+        )
+
+    def test_digest_groups_and_bounds_messages(self, tmp_path):
+        from digest import Digest
+        from outbox import Outbox
+
+        path = str(tmp_path / 'outbox')
+        outbox = Outbox(path, batch_size=10, max_attempts=2)
+        digest = Digest(outbox, interval=3600, max_items=3)
+        sent = []
+
+        def send(chat_id, text):
+            sent.append((chat_id, text))
+            return True
+
+        digest.add(1, 'first')
+        digest.add(1, 'second')
+        digest.add(2, 'other')
+        outbox.commit()
+        outbox.close()
+        outbox = Outbox(path, batch_size=10, max_attempts=2)
+        digest = Digest(outbox, interval=3600, max_items=3)
+        digest.flush_due()
+        outbox.drain(send)
+        assert not sent and len(outbox) == 3, (
+            'Убедитесь, что в режиме сводки сообщения накапливаются '
+            'в очереди и переживают перезапуск'
+        )
+        digest.add(1, 'third')
+        digest.add(1, 'fourth')
+        digest.flush_due()
+        outbox.drain(send)
+        assert [chat_id for chat_id, _ in sent] == ['1', '1'], (
+            'Убедитесь, что сводка отправляется при достижении `max_items`'
+        )
+        assert all(text in sent[0][1] for text in ('first', 'third')), (
+            'Убедитесь, что сводка содержит накопленные сообщения'
+        )
+        assert sent[1] == ('1', 'fourth')
+        digest.flush_all()
+        outbox.drain(send)
+        assert sent[-1] == ('2', 'other') and not len(outbox), (
+            'Убедитесь, что при остановке отправляются все сводки'
+        )
+        outbox.close()
+
+    def test_config_reload_applies_only_changes(self, tmp_path, monkeypatch):
+        import json
+        from config import ConfigWatcher
+        from scheduler import Scheduler
+
+        for v in self.ENV_VARS:
+            monkeypatch.delenv(v, raising=False)
+        path = tmp_path / 'config.json'
+        tenants = {
+            'anna': {'practicum_token': 'a', 'chat_id': 1},
+            'boris': {'practicum_token': 'b', 'chat_id': 2},
+        }
+        path.write_text(json.dumps({'tenants': tenants}))
+        import homework
+        watcher = ConfigWatcher(str(path), homework.TUNABLES)
+        scheduler = Scheduler()
+        settings, added, removed, changed = watcher.poll()
+        scheduler.apply(added, removed, changed)
+        assert set(scheduler.states) == {'anna', 'boris'}, (
+            'Убедитесь, что студенты из файла конфигурации попадают '
+            'в расписание'
+        )
+        assert watcher.poll() is None, (
+            'Убедитесь, что неизменённый файл не перечитывается'
+        )
+        anna = scheduler.states['anna']
+        anna.timestamp = 42
+        tenants['anna']['chat_id'] = 10
+        del tenants['boris']
+        tenants['vera'] = {'practicum_token': 'v', 'chat_id': 3}
+        path.write_text(json.dumps({
+            'settings': {'RETRY_TIME': 60}, 'tenants': tenants
+        }))
+        os.utime(path, ns=(0, 10 ** 18))
+        settings, added, removed, changed = watcher.poll()
+        assert settings == {'RETRY_TIME': 60}
+        assert [t.name for t in added] == ['vera'] and removed == ['boris']
+        assert [t.name for t in changed] == ['anna']
+        scheduler.apply(added, removed, changed)
+        assert scheduler.states['anna'] is anna and anna.timestamp == 42, (
+            'Убедитесь, что состояние изменённого студента сохраняется'
+        )
+        assert anna.tenant.chat_id == 10
+        assert set(scheduler.states) == {'anna', 'vera'}
+
+        tenants['gleb'] = {'practicum_token': 'g', 'chat_id': 4}
+        path.write_text(json.dumps({
+            'settings': {'RETRY_TIME': 'often', 'DIGEST_MODE': 'false'},
+            'tenants': tenants
+        }))
+        os.utime(path, ns=(0, 2 * 10 ** 18))
+        assert watcher.poll() is None, (
+            'Убедитесь, что файл с неверной настройкой не применяется'
+        )
+        for number, invalid in enumerate((
+            {'RETRY_ATTEMPTS': 0}, {'REQUEST_TIMEOUT': 0},
+            {'RETRY_TIME': 0}, {'RETRY_DEADLINE': 0},
+            {'DIGEST_MAX_ITEMS': 0}, {'RETRY_TIME': 1.5},
+        )):
+            path.write_text(json.dumps({
+                'settings': invalid, 'tenants': tenants
+            }))
+            os.utime(path, ns=(0, (2 * 10 ** 9 + number + 1) * 10 ** 9))
+            assert watcher.poll() is None, (
+                f'Убедитесь, что файл с настройкой {invalid} отвергается'
+            )
+        path.write_text(json.dumps({
+            'settings': {'DIGEST_MODE': 'false'}, 'tenants': tenants
+        }))
+        os.utime(path, ns=(0, 3 * 10 ** 18))
+        settings, added, removed, changed = watcher.poll()
+        assert settings == {'DIGEST_MODE': False}, (
+            'Убедитесь, что логические настройки разбираются явно'
+        )
+        assert [t.name for t in added] == ['gleb'], (
+            'Убедитесь, что студенты из отвергнутого файла не теряются'
+        )
+
+    def test_state_store_coalesces_stale_fetches(self):
+        import threading
+        from config import Tenant
+        from store import StateStore
+
+        store = StateStore(history_size=2, max_age=600)
+        tenant = Tenant('anna', 'token', 1)
+        store.record(tenant, [], ['first', 'second', 'third'])
+        assert store.history(1) == ['second', 'third'], (
+            'Убедитесь, что история чата ограничена `history_size`'
+        )
+        calls = []
+
+        def load(tenant):
+            calls.append(tenant)
+            time.sleep(0.05)
+            return [('hw', 'approved')]
+
+        results = []
+        threads = [
+            threading.Thread(
+                target=lambda: results.append(store.snapshot(1, load))
+            )
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+        started = time.monotonic()
+        store.record(tenant, [], ['fourth'])
+        assert time.monotonic() - started < 0.04, (
+            'Убедитесь, что запрос к API не блокирует запись результатов'
+        )
+        for thread in threads:
+            thread.join()
+        assert len(calls) == 1, (
+            'Убедитесь, что параллельные команды делают один запрос к API'
+        )
+        assert all(result == results[0] for result in results)
+        store.record(tenant, [('hw', 'rejected')], [])
+        assert store.snapshot(1, load) == [
+            ('anna', [('hw', 'rejected')], None)
+        ], 'Убедитесь, что результаты опроса обновляют кеш'
+        assert len(calls) == 1
+
+    def test_state_store_keeps_tenants_of_shared_chat_apart(self):
+        from config import Tenant
+        from store import StateStore
+
+        store = StateStore(history_size=5, max_age=0)
+        anna = Tenant('anna', 'a', 100)
+        boris = Tenant('boris', 'b', 100)
+        store.record(anna, [('hw05_final', 'approved')], ['anna approved'])
+        store.record(boris, [('hw05_final', 'rejected')], ['boris rejected'])
+        statuses = {
+            'anna': [('hw05_final', 'reviewing')],
+            'boris': [('hw05_final', 'rejected')],
+        }
+        loaded = []
+
+        def load(tenant):
+            loaded.append(tenant.name)
+            return statuses[tenant.name]
+
+        assert store.snapshot(100, load) == [
+            ('anna', [('hw05_final', 'reviewing')], None),
+            ('boris', [('hw05_final', 'rejected')], None),
+        ], 'Убедитесь, что студенты одного чата не затирают друг друга'
+        assert sorted(loaded) == ['anna', 'boris'], (
+            'Убедитесь, что устаревший кеш обновляется для каждого студента'
+        )
+        store.forget('anna')
+        assert [name for name, _, _ in store.snapshot(100, load)] == [
+            'boris'
+        ], 'Убедитесь, что удаляется только удалённый студент'
+        assert store.history(100) == ['anna approved', 'boris rejected']
+        store.track(Tenant('boris', 'b', 200))
+        try:
+            store.get(100)
+        except KeyError:
+            pass
+        else:
+            assert False, 'Убедитесь, что студент переезжает в новый чат'
+        assert store.chat_of('boris') == '200'
+
+    def test_status_command_separates_api_errors(self, monkeypatch):
+        from types import SimpleNamespace
+        from config import Tenant
+        from store import StateStore
+
+        import homework
+
+        def failing_load(tenant):
+            raise KeyError('homeworks')
+
+        store = StateStore(history_size=2, max_age=600)
+        store.track(Tenant('anna', 'token', 1))
+        store.track(Tenant('boris', 'token', 1))
+        sent = []
+        bot = SimpleNamespace(
+            send_message=lambda chat_id, text: sent.append((chat_id, text))
+        )
+        context = SimpleNamespace(bot=bot, bot_data={'store': store}, args=[])
+        monkeypatch.setattr(homework, 'load_homeworks', failing_load)
+        for chat_id in (1, 2):
+            update = SimpleNamespace(effective_chat=SimpleNamespace(id=chat_id))
+            homework.status(update, context)
+        assert sent[0][1] != homework.NOT_SUBSCRIBED, (
+            'Убедитесь, что ошибка API не выдаётся за отсутствие подписки'
+        )
+        assert 'anna:' in sent[0][1] and 'boris:' in sent[0][1], (
+            'Убедитесь, что /status показывает всех студентов чата'
+        )
+        assert sent[1] == (2, homework.NOT_SUBSCRIBED)
+        context.args = ['token']
+        monkeypatch.setattr(homework, 'SUBSCRIBE_CHATS', set())
+        homework.subscribe(update, context)
+        assert sent[-1] == (2, homework.SUBSCRIBE_CLOSED), (
+            'Убедитесь, что /subscribe доступен только разрешённым чатам'
+        )
+        monkeypatch.setattr(homework, 'SUBSCRIBE_CHATS', {'2'})
+        homework.subscribe(update, context)
+        context.args = ['token', 'anna']
+        homework.subscribe(update, context)
+        assert sent[-1] == (2, homework.SUBSCRIBE_CLOSED), (
+            'Убедитесь, что /subscribe не отдаёт студента из другого чата'
+        )
+        assert store.pop_subscriptions() == [Tenant('2', 'token', 2)]
+        shared = SimpleNamespace(effective_chat=SimpleNamespace(id=1))
+        context.args = ['new']
+        homework.subscribe(shared, context)
+        assert sent[-1] == (1, homework.SUBSCRIBE_USAGE), (
+            'Убедитесь, что в общем чате /subscribe требует имя студента'
+        )
+        context.args = ['new', 'boris']
+        homework.subscribe(shared, context)
+        assert store.pop_subscriptions() == [Tenant('boris', 'new', 1)], (
+            'Убедитесь, что меняется токен указанного студента'
+        )
+
+    def test_tracer_records_stages_of_slow_cycle(self, caplog):
+        from tracing import NO_SPAN, Tracer
+
+        assert Tracer(enabled=False).span('stage') is NO_SPAN, (
+            'Убедитесь, что выключенная трассировка ничего не замеряет'
+        )
+        tracer = Tracer(enabled=True, threshold=0)
+        tracer.start_cycle()
+        for _ in range(2):
+            with tracer.span('requests.get'):
+                pass
+        with tracer.span('send_message'):
+            pass
+        elapsed, spans = tracer.end_cycle()
+        assert spans['requests.get'][1] == 2 and 'send_message' in spans, (
+            'Убедитесь, что этапы цикла замеряются'
+        )
+        assert 'requests.get' in caplog.text, (
+            'Убедитесь, что медленный цикл логируется с разбивкой по этапам'
+        )
+
+    def test_health_endpoint_and_watchdog(self, monkeypatch):
+        import json
+        import threading
+        import urllib.error
+        import urllib.request
+        import health as health_module
+        from health import Health, Watchdog, serve
+
+        state = Health()
+        state.deadline = 0.05
+        monkeypatch.setattr(health_module, 'health', state)
+        server = serve(0)
+        url = f'http://127.0.0.1:{server.server_port}'
+        try:
+            try:
+                urllib.request.urlopen(url + '/readyz')
+            except urllib.error.HTTPError as error:
+                assert error.code == 503, (
+                    'Убедитесь, что до первого опроса /readyz отвечает 503'
+                )
+            else:
+                assert False, 'Убедитесь, что /readyz проверяет опрос API'
+            state.polled('anna', 'error')
+            state.polled('boris', 'error')
+            state.polled('boris', 'error')
+            state.polled('anna')
+            with urllib.request.urlopen(url + '/readyz') as response:
+                details = json.load(response)
+            assert details['failing_tenants'] == 1, (
+                'Убедитесь, что ошибки опроса учитываются по студентам'
+            )
+            assert details['consecutive_failures'] == 2
+            assert 'retries' in details, (
+                'Убедитесь, что отчёт содержит статистику повторов'
+            )
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        release = threading.Event()
+        restarted = threading.Event()
+        generations = []
+
+        def target(alive):
+            generations.append(alive)
+            if len(generations) == 1:
+                state.beat()
+                release.wait(1)
+            else:
+                restarted.set()
+                release.wait(1)
+
+        watchdog = Watchdog(target, check_interval=0.01)
+        threading.Thread(target=watchdog.run, daemon=True).start()
+        assert restarted.wait(1), (
+            'Убедитесь, что сторожевой таймер перезапускает зависший цикл'
+        )
+        assert not generations[0]() and generations[1](), (
+            'Убедитесь, что брошенный поток опроса узнаёт о перезапуске'
+        )
+        assert state.restarts >= 1
+        watchdog.stop()
+        release.set()
+
+        state.restarts = 0
+        watchdog = Watchdog(lambda alive: None, check_interval=0.05)
+        threading.Thread(target=watchdog.run, daemon=True).start()
+        time.sleep(0.2)
+        watchdog.stop()
+        assert state.restarts <= 5, (
+            'Убедитесь, что упавший поток перезапускается не чаще '
+            'раза в `check_interval`'
+        )
+
+    def test_outbox_survives_restart_and_redelivers(self, tmp_path):
+        from outbox import Outbox
+
+        path = str(tmp_path / 'outbox')
+        outbox = Outbox(path, batch_size=10, max_attempts=2)
+        for text in ('first', 'second'):
+            outbox.put(1, text)
+        outbox.put(2, 'other')
+        outbox.commit()
+        outbox.close()
+
+        outbox = Outbox(path, batch_size=10, max_attempts=2)
+        assert len(outbox) == 3, (
+            'Убедитесь, что сохранённые уведомления переживают перезапуск'
+        )
+        sent = []
+
+        def flaky_send(chat_id, message):
+            if chat_id == '1':
+                return False
+            sent.append(message)
+            return True
+
+        failed, more = outbox.drain(flaky_send)
+        assert failed == 1 and sent == ['other'] and len(outbox) == 2, (
+            'Убедитесь, что неотправленные уведомления остаются в очереди'
+        )
+        outbox.drain(lambda chat_id, message: sent.append(message) or True)
+        assert sent == ['other', 'first', 'second'] and not len(outbox), (
+            'Убедитесь, что очередь доставляется по порядку'
+        )
+        outbox.put(1, 'kept')
+        outbox.commit()
+        assert outbox.wakeup.is_set()
+        outbox.wakeup.clear()
+        outbox.commit()
+        assert not outbox.wakeup.is_set(), (
+            'Убедитесь, что пустой commit не будит фоновую отправку'
+        )
+        for _ in range(3):
+            outbox.drain(lambda chat_id, message: None)
+        assert len(outbox) == 1, (
+            'Убедитесь, что временные ошибки не засчитываются в `max_attempts`'
+        )
+        outbox.drain(lambda chat_id, message: False)
+        outbox.drain(lambda chat_id, message: False)
+        assert not len(outbox), (
+            'Убедитесь, что после `max_attempts` уведомление удаляется'
+        )
+        outbox.close()
+
+    def test_send_to_chat_separates_transient_errors(self):
+        from types import SimpleNamespace
+        import telegram.error
+
+        import homework
+
+        for error, expected in (
+            (telegram.error.TimedOut(), None),
+            (telegram.error.RetryAfter(5), None),
+            (telegram.error.NetworkError('reset'), None),
+            (telegram.error.BadRequest('Chat not found'), False),
+            (telegram.error.Unauthorized('blocked'), False),
+        ):
+            def send_message(chat_id, message, error=error):
+                raise error
+
+            bot = SimpleNamespace(send_message=send_message)
+            assert homework.send_to_chat(bot, 1, 'text') is expected, (
+                f'Убедитесь, что {type(error).__name__} '
+                'правильно отнесена к временным или постоянным ошибкам'
+            )
+
+    def test_record_and_replay_api_traffic(self, monkeypatch, tmp_path,
+                                           random_timestamp,
+                                           current_timestamp):
+        from replay import Recorder, ReplayTransport, load_records
+
+        responses = iter([HTTPStatus.OK, None])
+
+        def mock_response_get(*args, **kwargs):
+            http_status = next(responses)
+            if http_status is None:
+                raise requests.ConnectionError()
+            return MockResponseGET(
+                *args, random_timestamp=random_timestamp,
+                current_timestamp=current_timestamp,
+                http_status=http_status, **kwargs
+            )
+
+        import homework
+
+        path = str(tmp_path / 'traffic.jsonl')
+        monkeypatch.setattr(
+            homework, 'TRANSPORT', Recorder(path).wrap(mock_response_get)
+        )
+        monkeypatch.setattr(homework, 'RETRY_ATTEMPTS', 1)
+        recorded = homework.get_api_answer(current_timestamp)
+        try:
+            homework.get_api_answer(current_timestamp)
+        except ConnectionError:
+            pass
+        records = load_records(path)
+        assert len(records) == 2
+        assert records[0]['headers']['Authorization'] == 'OAuth ***', (
+            'Убедитесь, что токен не попадает в запись'
+        )
+        from replay import redact
+        for value in ('token', 'OAuth  token', 'OAuth token extra'):
+            assert redact({'Authorization': value}) == {
+                'Authorization': '***'
+            }, 'Убедитесь, что токен без схемы скрывается целиком'
+
+        paced = ReplayTransport([
+            {'offset': 10, 'elapsed': 0, 'status_code': 200, 'json': {}},
+            {'offset': 10.2, 'elapsed': 0.1, 'status_code': 200, 'json': {}},
+        ], speed=2)
+        started = time.monotonic()
+        paced('url')
+        paced('url')
+        assert 0.14 <= time.monotonic() - started < 0.5, (
+            'Убедитесь, что запросы воспроизводятся в записанном темпе'
+        )
+
+        monkeypatch.setattr(
+            homework, 'TRANSPORT', ReplayTransport(records, speed=0)
+        )
+        assert homework.get_api_answer(current_timestamp) == recorded, (
+            'Убедитесь, что воспроизводятся записанные ответы'
+        )
+        try:
+            homework.get_api_answer(current_timestamp)
+        except ConnectionError:
+            pass
+        else:
+            assert False, 'Убедитесь, что воспроизводятся сетевые ошибки'
+
+    def test_parse_status_unknown_status_value_error(self):
+        import homework
+
+        try:
+            homework.parse_status({'homework_name': 'hw', 'status': 'new'})
+        except ValueError:
+            pass
+        else:
+            assert False, (
+                'Убедитесь, что `parse_status` выбрасывает `ValueError` '
+                'для недокументированного статуса'
+            )
+
+    def test_response_validator_reports_all_problems(self):
+        import homework
+        from schema import ResponseValidator
+
+        response = {'homeworks': [
+            {'homework_name': 'hw1', 'status': 'approved'},
+            {'homework_name': 'hw2'},
+            'hw3',
+            {'homework_name': 'hw4', 'status': 'new'},
+            {'homework_name': 'hw5', 'status': 'rejected'},
+            {'homework_name': 'hw6', 'status': ['approved']},
+            {'homework_name': 7, 'status': 'approved'},
+        ]}
+        validate = ResponseValidator(
+            homework.VERDICTS, homework.CHANGED_STATUS
+        )
+        homeworks, problems = validate(response)
+        assert [hw.name for hw in homeworks] == ['hw1', 'hw5'], (
+            'Убедитесь, что корректные работы не теряются из-за ошибок'
+        )
+        assert homeworks[0].message == homework.parse_status(
+            response['homeworks'][0]
+        )
+        assert len(problems) == 5, (
+            'Убедитесь, что валидатор сообщает обо всех ошибках схемы, '
+            'в том числе о нестроковых названиях и статусах'
+        )
+        del response['homeworks'][5:]
+        del response['homeworks'][1:3]
+        for policy, names in (('skip', ['hw1', 'hw5']),
+                              ('generic', ['hw1', 'hw4', 'hw5'])):
+            validate = ResponseValidator(
+                homework.VERDICTS, homework.CHANGED_STATUS, policy
+            )
+            homeworks, problems = validate(response)
+            assert [hw.name for hw in homeworks] == names and not problems, (
+                f'Убедитесь, что политика `{policy}` применяется '
+                'к неизвестным статусам'
+            )
+        for invalid in ([], {}, {'homeworks': {}}):
+            try:
+                validate(invalid)
+            except (TypeError, KeyError):
+                pass
+            else:
+                assert False, (
+                    'Убедитесь, что некорректный ответ целиком '
+                    'вызывает ошибку, как в `check_response`'
+                )
+
+    def test_poll_descriptor_applies_current_retry_settings(
+            self, monkeypatch):
+        from scheduler import TenantState
+        from config import Tenant
+
+        import homework
+
+        calls = []
+
+        def failing_get(*args, **kwargs):
+            calls.append(kwargs)
+            raise requests.ConnectionError()
+
+        for name in homework.RETRY_SETTINGS:
+            monkeypatch.setattr(homework, name, getattr(homework, name))
+        monkeypatch.setattr(homework, 'TRANSPORT', failing_get)
+        homework.RETRY_ATTEMPTS = 2
+        descriptor = homework.describe(
+            TenantState(Tenant('anna', 'token', 1), 0, 0)
+        )
+        homework.RETRY_ATTEMPTS = 5
+        result = homework.poll_descriptor(descriptor)
+        assert result[5] is not None and len(calls) == 2, (
+            'Убедитесь, что процесс пула применяет настройки повторов, '
+            'переданные в описании задачи'
+        )
+        assert homework.crashed_result(descriptor)[0] == 'anna'
+
+    def test_worker_pool_restarts_crashed_worker(self):
+        from pool import WorkerPool
+
+        pool = WorkerPool(
+            2, crash_on_negative, lambda task: 'crashed', max_crashes=2
+        )
+        try:
+            assert pool.map([1, -1, 2, 3]) == [2, 'crashed', 4, 6], (
+                'Убедитесь, что пул возвращает результаты по порядку, '
+                'а упавшая задача получает результат `on_crash`'
+            )
+            assert pool.restarts == 2
+            assert pool.map([4]) == [8], (
+                'Убедитесь, что после перезапуска процессы пула работают'
+            )
+        finally:
+            pool.close()
+
+        pool = WorkerPool(
+            2, crash_on_negative, lambda task: 'timeout', task_timeout=3
+        )
+        beats = []
+        try:
+            pool.map([1, 2])
+            assert pool.map([1, 0, 2], lambda: beats.append(1)) == [
+                2, 'timeout', 4
+            ], 'Убедитесь, что зависшая задача получает результат `on_crash`'
+            assert len(beats) == 3, (
+                'Убедитесь, что о каждом результате сообщается через progress'
+            )
+            assert pool.restarts == 1 and pool.map([3]) == [6], (
+                'Убедитесь, что зависший процесс пула перезапускается'
+            )
+        finally:
+            pool.close()
@@ -0,0 +1,110 @@
+import cProfile
+import io
+import logging
+import os
+import pstats
+import threading
+import time
+from contextlib import contextmanager, nullcontext
+
+SLOW_CYCLE = 'Медленный цикл: {:.3f} с. {}'
+SPAN = '{} - {:.3f} с ({})'
+PROFILE_STARTED = 'Профилирование запущено'
+PROFILE_SAVED = 'Профиль сохранён в {}\n{}'
+PROFILE_TOP = 20
+
+NO_SPAN = nullcontext()
+
+
+class Tracer:
+    """Замеры времени этапов цикла опроса.
+
+    Выключенный трассировщик возвращает из span общий пустой контекст,
+    поэтому замеры в коде почти ничего не стоят.
+    """
+
+    def __init__(self, enabled=False, threshold=0.0):
+        """Порог threshold: циклы дольше него попадают в лог."""
+        self.enabled = enabled
+        self.threshold = threshold
+        self.thread = None
+        self.started = None
+        self.spans = {}
+        self.profile = None
+        self.profile_requested = False
+
+    def start_cycle(self):
+        """Начало цикла опроса в текущем потоке."""
+        if not self.enabled:
+            return
+        self.thread = threading.get_ident()
+        self.started = time.perf_counter()
+        self.spans = {}
+
+    def end_cycle(self):
+        """Конец цикла; возвращает длительность и этапы."""
+        if not self.enabled or self.started is None:
+            return None
+        elapsed = time.perf_counter() - self.started
+        spans, self.spans, self.started = self.spans, {}, None
+        if elapsed >= self.threshold:
+            logging.warning(SLOW_CYCLE.format(elapsed, '; '.join(
+                SPAN.format(name, total, count)
+                for name, (total, count) in sorted(
+                    spans.items(), key=lambda item: -item[1][0]
+                )
+            )))
+        return elapsed, spans
+
+    def span(self, name):
+        """Контекст замера этапа name."""
+        if not self.enabled or self.thread != threading.get_ident():
+            return NO_SPAN
+        return self._measure(name)
+
+    @contextmanager
+    def _measure(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            total, count = self.spans.get(name, (0.0, 0))
+            self.spans[name] = (
+                total + time.perf_counter() - started, count + 1
+            )
+
+    def request_profile(self):
+        """Запрос на переключение профилирования, например из сигнала."""
+        self.profile_requested = True
+
+    def check_profile(self, path):
+        """Переключение профилирования в потоке опроса, если запрошено.
+
+        cProfile замеряет только поток, в котором включён, поэтому
+        обработчик сигнала лишь ставит флаг.
+        """
+        if self.profile_requested:
+            self.profile_requested = False
+            self.toggle_profile(path)
+
+    def toggle_profile(self, path):
+        """Запуск cProfile или остановка с сохранением в path."""
+        if self.profile is None:
+            self.profile = cProfile.Profile()
+            self.profile.enable()
+            logging.info(PROFILE_STARTED)
+            return
+        profile, self.profile = self.profile, None
+        profile.disable()
+        profile.dump_stats(path)
+        report = io.StringIO()
+        pstats.Stats(profile, stream=report).sort_stats(
+            'cumulative'
+        ).print_stats(PROFILE_TOP)
+        logging.info(PROFILE_SAVED.format(path, report.getvalue()))
+
+
+tracer = Tracer(
+    os.getenv('TRACE_ENABLED', '').lower() in ('1', 'true', 'yes'),
+    float(os.getenv('SLOW_CYCLE_THRESHOLD', 30))
+)